@@ -0,0 +1,9 @@
+-- HSCode별 최신 상세 분석 결과 조회 인덱스 추가 마이그레이션
+-- 목적: detected_hscode로 최신 분석 결과 1건을 조회할 때 정렬 없이 인덱스만으로 찾기 위함
+
+-- CREATE INDEX CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 BEGIN/COMMIT 없이 실행
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_detail_page_analyses_hscode_created
+ON public.detail_page_analyses (detected_hscode, created_at DESC);
+
+-- 변경사항 확인
+\d detail_page_analyses;
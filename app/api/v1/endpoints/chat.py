@@ -2,21 +2,40 @@
 채팅 API 엔드포인트
 """
 
-from fastapi import APIRouter, Depends, Request, BackgroundTasks
+from fastapi import APIRouter, Depends, Query, Request, BackgroundTasks
 from fastapi.responses import StreamingResponse, JSONResponse  # JSONResponse 추가
 from sqlalchemy.ext.asyncio import AsyncSession
 import asyncio
-import json
 import logging
+import time
+from contextlib import aclosing
 from typing import AsyncGenerator, Union  # Union 추가
 
+import orjson
+
 from app.api.v1.dependencies import get_chat_service, get_db
 from app.models.chat_models import ChatRequest
 from app.services.chat_service import ChatService
+from app.services.enhanced_detail_generator import get_detail_generator
+from app.services.sse_event_generator import SSEEventGenerator
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# SSE 응답 공통 헤더
+SSE_RESPONSE_HEADERS = {
+    # SSE 표준 헤더 설정
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With",
+    "Access-Control-Expose-Headers": "Content-Type",
+    # 청크 전송 최적화
+    "Transfer-Encoding": "chunked",
+    "X-Accel-Buffering": "no",  # nginx 버퍼링 비활성화
+}
+
 
 @router.post(
     "", summary="AI Chat Endpoint with HSCode Search and Streaming", response_model=None
@@ -98,7 +117,7 @@ async def handle_chat(
                 "session_uuid": chat_request.session_uuid,
                 "timestamp": asyncio.get_event_loop().time(),
             }
-            session_info_json = json.dumps(session_info, ensure_ascii=False)
+            session_info_json = orjson.dumps(session_info).decode()
             yield f"event: chat_session_info\ndata: {session_info_json}\n\n"
 
             # 백프레셔 방지를 위한 짧은 대기
@@ -138,7 +157,7 @@ async def handle_chat(
                         data_part = chunk.split("data: ", 1)[1].split("\n\n")[0]
                         logger.info(f"추출된 data 부분: {data_part}")
 
-                        delta_data = json.loads(data_part)
+                        delta_data = orjson.loads(data_part)
 
                         # 디버깅을 위한 delta_data 구조 로깅
                         logger.info(f"delta_data 구조: {delta_data}")
@@ -167,7 +186,7 @@ async def handle_chat(
                         else:
                             logger.warning(f"알 수 없는 delta_data 형식: {delta_data}")
 
-                except (json.JSONDecodeError, KeyError, IndexError, TypeError) as e:
+                except (orjson.JSONDecodeError, KeyError, IndexError, TypeError) as e:
                     # JSON 파싱 실패하거나 예상된 구조가 아닌 경우는 디버깅을 위해 로깅
                     logger.info(
                         f"텍스트 추출 실패 - chunk: {chunk[:200]}..., error: {e}"
@@ -211,18 +230,74 @@ async def handle_chat(
     response = StreamingResponse(
         generate_sse_stream(),
         media_type="text/event-stream",
-        headers={
-            # SSE 표준 헤더 설정
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With",
-            "Access-Control-Expose-Headers": "Content-Type",
-            # 청크 전송 최적화
-            "Transfer-Encoding": "chunked",
-            "X-Accel-Buffering": "no",  # nginx 버퍼링 비활성화
-        },
+        headers=SSE_RESPONSE_HEADERS,
     )
 
     return response
+
+
+@router.get("/detail/stream", summary="HSCode Detail Sections Streaming")
+async def stream_detail_sections(
+    request: Request,
+    hscode: str = Query(
+        ...,
+        pattern=r"^\d{4}(?:\.?\d{2}){0,3}$",
+        max_length=13,
+        description="HSCode (숫자와 점만 허용, 예: 8517.12.00)",
+    ),
+    product_description: str = Query(
+        ..., min_length=1, max_length=500, description="제품 설명"
+    ),
+) -> StreamingResponse:
+    """
+    HSCode 상세 정보를 항목별로 생성하여 완료되는 순서대로 스트리밍함.
+    같은 HSCode/제품의 진행 중인 항목 생성은 다른 요청과 공유함.
+
+    - **응답:** `text/event-stream` 형식의 SSE 스트림.
+        - `event: detail_section`: 항목 하나의 생성 결과 (section, data, error)
+        - `event: detail_sections_complete`: 전체 항목 생성 완료
+        - `event: detail_sections_error`: 스트리밍 중 오류 발생
+    """
+    detail_generator = get_detail_generator()
+    sse_generator = SSEEventGenerator()
+
+    async def generate_sse_stream() -> AsyncGenerator[str, None]:
+        start_time = time.perf_counter()
+        sections_generated = 0
+        try:
+            # 연결이 끊겨 순회를 멈추면 남은 항목은 더 기다리지 않음
+            # (이미 시작된 LLM 호출은 공유 작업이므로 끝까지 진행되어 캐시됨)
+            async with aclosing(
+                detail_generator.iter_detail_sections(hscode, product_description)
+            ) as sections:
+                async for section, result in sections:
+                    if await request.is_disconnected():
+                        logger.info(
+                            "상세 정보 스트리밍 중 클라이언트가 연결을 해제했습니다."
+                        )
+                        return
+                    sections_generated += 1
+                    yield sse_generator.generate_detail_section_event(
+                        hscode, section, result
+                    )
+
+            yield sse_generator.generate_detail_sections_complete_event(
+                hscode,
+                sections_generated,
+                int((time.perf_counter() - start_time) * 1000),
+            )
+        except asyncio.CancelledError:
+            logger.info("상세 정보 스트리밍이 취소되었습니다.")
+        except Exception as e:
+            logger.error(f"상세 정보 스트리밍 중 예외 발생: {e}", exc_info=True)
+            yield sse_generator.generate_detail_sections_error_event(
+                hscode,
+                "DETAIL_SECTIONS_ERROR",
+                "상세 정보 생성 중 오류가 발생했습니다.",
+            )
+
+    return StreamingResponse(
+        generate_sse_stream(),
+        media_type="text/event-stream",
+        headers=SSE_RESPONSE_HEADERS,
+    )
@@ -27,6 +27,9 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "postgresql://localhost:5432/tradedb"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800  # seconds
 
     # Redis - 환경변수 기반 설정으로 변경
     REDIS_HOST: str = "localhost"
@@ -64,6 +67,21 @@ class Settings(BaseSettings):
     ANTHROPIC_API_KEY: str = Field(default="", alias="ANTHROPIC_API_KEY")
     VOYAGE_API_KEY: str = ""
     ANTHROPIC_MODEL: str = "claude-sonnet-4-20250514"
+    ANTHROPIC_RPM_LIMIT: int = Field(
+        default=50, description="Claude API 분당 요청 수 한도 (계정 등급 기준)"
+    )
+    ANTHROPIC_AVG_LATENCY_SECONDS: float = Field(
+        default=30.0, description="상세 정보 항목 생성 1회의 평균 소요 시간 (초)"
+    )
+    ANTHROPIC_MAX_CONCURRENCY: int | None = Field(
+        default=None,
+        description="상세 정보 생성 시 동시에 보내는 Claude API 요청 수 제한 "
+        "(지정하지 않으면 RPM 한도와 평균 소요 시간으로 계산)",
+    )
+    FALLBACK_STREAM_DELAY_MS: int = Field(
+        default=0,
+        description="폴백 의사 스트리밍 시 청크 사이 인위적 지연 (0이면 지연 없음)",
+    )
 
     # Web Search Settings
     WEB_SEARCH_ENABLED: bool = True
@@ -77,6 +95,20 @@ class Settings(BaseSettings):
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:8081", "http://127.0.0.1:8081"]
 
+    @property
+    def anthropic_concurrency_limit(self) -> int:
+        """
+        상세 정보 생성 시 동시에 보내는 Claude API 요청 수.
+        RPM 한도 × 평균 소요 시간 / 60 이면 레이트 리밋을 넘지 않으면서 한도를 모두 사용함.
+        값을 키우면 처리량은 늘지만 429 재시도가 잦아지고, 줄이면 요청이 호출 슬롯을
+        기다리는 시간이 늘어남 (슬롯 대기는 생성기에서 별도 제한 시간으로 끊음).
+        """
+        if self.ANTHROPIC_MAX_CONCURRENCY:
+            return self.ANTHROPIC_MAX_CONCURRENCY
+        return max(
+            1, int(self.ANTHROPIC_RPM_LIMIT * self.ANTHROPIC_AVG_LATENCY_SECONDS / 60)
+        )
+
     # 비동기 드라이버를 사용하도록 URL을 재구성
     @property
     def ASYNC_DATABASE_URL(self) -> str:
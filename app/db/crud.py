@@ -232,8 +232,9 @@ class CRUDChat:
         """새로운 채팅 메시지를 생성"""
         db_message = db_models.ChatMessage(**message_in.model_dump())
         db.add(db_message)
+        # SQLAlchemy 2.0은 INSERT ... RETURNING으로 PK와 server_default(created_at)를
+        # 함께 가져오므로 별도의 refresh(SELECT) 왕복이 필요 없음
         await db.flush()
-        await db.refresh(db_message)
         return db_message
 
     async def delete_messages_by_session_uuid(
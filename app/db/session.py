@@ -1,5 +1,8 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
+
+import orjson
+
 from app.core.config import settings
 
 # DATABASE_URL을 비동기 드라이버로 변환
@@ -7,9 +10,26 @@ async_database_url = str(settings.DATABASE_URL).replace(
     "postgresql://", "postgresql+asyncpg://"
 )
 
+
+def _json_serializer(value: Any) -> str:
+    """JSON/JSONB 컬럼 직렬화 (표준 json 대신 orjson 사용)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 # 비동기 엔진 생성
 # echo=True는 개발 시 SQL 쿼리를 로깅하기 위함이며, 프로덕션에서는 False로 설정하는 것이 좋음
-engine = create_async_engine(async_database_url, echo=True)
+# 커넥션 풀은 포그라운드 요청과 백그라운드 저장 워커가 함께 사용하므로 크기를 명시함
+# (pool_pre_ping으로 끊어진 커넥션을 걸러내고, pool_recycle로 오래된 커넥션을 교체)
+engine = create_async_engine(
+    async_database_url,
+    echo=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
 
 # 비동기 세션 팩토리 생성
 # expire_on_commit=False는 세션이 커밋된 후에도 ORM 객체에 접근할 수 있도록 함
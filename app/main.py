@@ -2,6 +2,8 @@
 FastAPI 메인 애플리케이션
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -14,12 +16,22 @@ from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.logging_config import configure_logging
 from app.core.middleware.logging_middleware import LoggingMiddleware
+from app.services.detail_page_service import get_detail_page_service
 
 set_debug(True)
 
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 시작 시 백그라운드 저장 워커를 시작하고, 종료 시 남은 작업을 처리한 뒤 정리"""
+    detail_page_service = get_detail_page_service()
+    detail_page_service.start_save_workers()
+    yield
+    await detail_page_service.stop_save_workers()
+
+
 def create_app() -> FastAPI:
     """
     FastAPI 애플리케이션을 생성하고 설정합니다.
@@ -35,6 +47,7 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.PROJECT_NAME,
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
     )
 
     # 전역 RequestValidationError 핸들러 추가
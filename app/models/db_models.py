@@ -152,6 +152,7 @@ class ChatSession(Base):
         cascade="all, delete-orphan",
         primaryjoin="ChatSession.session_uuid==foreign(ChatMessage.session_uuid)",
         foreign_keys="[ChatMessage.session_uuid]",
+        order_by="ChatMessage.created_at",
     )
 
     __table_args__ = (
@@ -532,6 +533,12 @@ class DetailPageAnalysis(Base):
             "market_analysis",
             postgresql_using="gin",
         ),
+        # HSCode별 최신 분석 결과 조회용 (ORDER BY created_at DESC LIMIT 1)
+        Index(
+            "idx_detail_page_analyses_hscode_created",
+            "detected_hscode",
+            desc("created_at"),
+        ),
     )
 
 
@@ -17,13 +17,20 @@ from app.models.chat_models import (
 
 logger = logging.getLogger(__name__)
 
+# 화물번호 패턴에 매칭되지 않을 때 사용하는 숫자 시퀀스 패턴
+_NUMBER_SEQUENCE_RE = re.compile(r"\d{4,}")
+_LONG_NUMBER_SEQUENCE_RE = re.compile(r"\d{6,}")
+
 
 class CargoTrackingService:
     """화물통관 조회 인식 및 처리 서비스"""
 
     def __init__(self):
-        self.patterns = CARGO_NUMBER_PATTERNS
-        self.keywords = CARGO_TRACKING_KEYWORDS
+        # 패턴 컴파일과 키워드 소문자 변환은 메시지마다 반복하지 않도록 한 번만 수행
+        self.patterns = {
+            name: re.compile(pattern) for name, pattern in CARGO_NUMBER_PATTERNS.items()
+        }
+        self.keywords = tuple(keyword.lower() for keyword in CARGO_TRACKING_KEYWORDS)
 
     async def detect_cargo_tracking_intent(self, message: str) -> Tuple[bool, float]:
         """
@@ -58,11 +65,9 @@ class CargoTrackingService:
 
     def _calculate_keyword_score(self, message_lower: str) -> float:
         """키워드 기반 점수 계산"""
-        matched_keywords = []
-
-        for keyword in self.keywords:
-            if keyword.lower() in message_lower:
-                matched_keywords.append(keyword)
+        matched_keywords = [
+            keyword for keyword in self.keywords if keyword in message_lower
+        ]
 
         # 매칭된 키워드 수에 따른 점수 (최대 1.0)
         if not matched_keywords:
@@ -79,7 +84,7 @@ class CargoTrackingService:
         matched_patterns = []
 
         for pattern_name, pattern in self.patterns.items():
-            if re.search(pattern, message):
+            if pattern.search(message):
                 matched_patterns.append(pattern_name)
 
         # 패턴 매칭 시 높은 점수
@@ -87,7 +92,7 @@ class CargoTrackingService:
             return 0.8
 
         # 숫자 조합이 많으면 화물번호일 가능성
-        number_sequences = re.findall(r"\d{4,}", message)
+        number_sequences = _NUMBER_SEQUENCE_RE.findall(message)
         if number_sequences:
             return 0.4
 
@@ -111,14 +116,14 @@ class CargoTrackingService:
             matched_patterns = []
 
             for pattern_name, pattern in self.patterns.items():
-                matches = re.findall(pattern, message)
+                matches = pattern.findall(message)
                 if matches:
                     cargo_numbers.extend(matches)
                     matched_patterns.extend([pattern_name] * len(matches))
 
             # 패턴에 매칭되지 않는 경우 숫자 시퀀스 추출
             if not cargo_numbers:
-                number_sequences = re.findall(r"\d{6,}", message)
+                number_sequences = _LONG_NUMBER_SEQUENCE_RE.findall(message)
                 if number_sequences:
                     cargo_numbers = number_sequences
                     matched_patterns = ["general_number"] * len(number_sequences)
@@ -143,7 +148,7 @@ class CargoTrackingService:
             return CargoTrackingData(
                 cargo_number=main_cargo_number,
                 cargo_type=cargo_type,
-                extracted_patterns=list(set(matched_patterns)),
+                extracted_patterns=list(dict.fromkeys(matched_patterns)),
                 confidence_score=confidence,
             )
 
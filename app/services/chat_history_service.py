@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
@@ -54,14 +54,26 @@ class PostgresChatMessageHistory(BaseChatMessageHistory):
     SQLAlchemy 비동기 세션을 사용하여 DB와 상호작용하도록 수정됨.
     """
 
-    def __init__(self, db: AsyncSession, user_id: int, session: schemas.ChatSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        session: schemas.ChatSession,
+        preloaded_messages: Optional[List[ChatMessage]] = None,
+    ):
         """
         초기화 시 DB 세션, 사용자 ID, 그리고 이미 생성/조회된 ChatSession 객체를 받음.
+
+        preloaded_messages가 주어지면 (예: selectinload로 함께 조회된 세션 메시지)
+        초기 캐시로 사용하여 aget_messages()에서 동일한 행을 다시 조회하지 않음.
         """
         self.db = db
         self.user_id = user_id
         # 외부에서 주입된, DB와 동기화된 세션 객체를 사용
         self.session_uuid = session.session_uuid
+        self._cached_messages: Optional[List[ChatMessage]] = (
+            list(preloaded_messages) if preloaded_messages is not None else None
+        )
 
     @property
     def messages(self) -> List[BaseMessage]:
@@ -80,11 +92,12 @@ class PostgresChatMessageHistory(BaseChatMessageHistory):
         )
 
     async def aget_messages(self) -> List[BaseMessage]:
-        """DB에서 비동기적으로 메시지를 조회."""
-        db_messages = await crud_chat.get_messages_by_session(
-            db=self.db, session_uuid=self.session_uuid
-        )
-        return await _db_messages_to_langchain_messages(db_messages)
+        """DB에서 비동기적으로 메시지를 조회. 캐시가 있으면 재조회하지 않음."""
+        if self._cached_messages is None:
+            self._cached_messages = await crud_chat.get_messages_by_session(
+                db=self.db, session_uuid=self.session_uuid
+            )
+        return await _db_messages_to_langchain_messages(self._cached_messages)
 
     async def aadd_message(self, message: BaseMessage) -> None:
         """메시지 하나를 DB에 비동기적으로 추가"""
@@ -94,7 +107,12 @@ class PostgresChatMessageHistory(BaseChatMessageHistory):
             message_type=_langchain_type_to_db_type(message_data["type"]),
             content=message_data["data"]["content"],
         )
-        await crud_chat.create_message(db=self.db, message_in=message_create)
+        db_message = await crud_chat.create_message(
+            db=self.db, message_in=message_create
+        )
+        # 캐시가 로드된 상태라면 새 메시지를 덧붙여 최신 상태를 유지
+        if self._cached_messages is not None:
+            self._cached_messages.append(db_message)
 
     async def aadd_messages(self, messages: List[BaseMessage]) -> None:
         """여러 메시지를 DB에 비동기적으로 추가"""
@@ -108,6 +126,7 @@ class PostgresChatMessageHistory(BaseChatMessageHistory):
         await crud_chat.delete_messages_by_session_uuid(
             db=self.db, session_uuid=self.session_uuid
         )
+        self._cached_messages = []
 
     # ----------------------------------------------------------------
     # 기존 동기 메서드들은 에러를 발생시키도록 남겨두거나, 삭제합니다.
@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import json
 import re
@@ -11,13 +12,17 @@ from typing import (
     Union,
     Optional,
     Tuple,
+    Set,
 )
 import uuid
 from datetime import datetime
+
+import orjson
 from langchain_core.output_parsers import StrOutputParser
 from fastapi import BackgroundTasks, Request
 from fastapi.responses import JSONResponse
 from langchain_core.documents import Document
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import (
@@ -50,17 +55,69 @@ from app.services.intent_classification_service import (
     IntentClassificationService,
     IntentType,
 )
-from app.services.enhanced_detail_generator import EnhancedDetailGenerator
+from app.services.enhanced_detail_generator import get_detail_generator
 from app.core.config import settings
 from app.services.parallel_task_manager import ParallelTaskManager
 from app.services.sse_event_generator import SSEEventGenerator
 from app.models import db_models
+from app.utils.llm_response_parser import extract_text_from_anthropic_response
 from langchain_core.messages import AIMessageChunk
 
 logger = logging.getLogger(__name__)
 
 
+# 세션 제목 생성 시 참고하는 AI 응답 앞부분 길이
+TITLE_CONTEXT_CHARS = 500
+
+# 스트리밍 델타 병합 기준: 이 길이나 간격을 넘으면 모아둔 텍스트를 한 프레임으로 전송
+DELTA_FLUSH_CHARS = 512
+DELTA_FLUSH_INTERVAL = 0.016
+
+# 같은 질문/응답 앞부분에 대한 세션 제목 캐시 (LLM 재호출 방지)
+TITLE_CACHE_KEY_CHARS = 200
+TITLE_CACHE_TTL = 600
+_title_cache: Dict[str, Dict[str, Any]] = {}
+
+# 응답 종료 후 실행되는 백그라운드 작업 참조 (GC로 인한 작업 유실 방지)
+_background_tasks: Set[asyncio.Task] = set()
+
+# 요청마다 내용이 변하지 않는 스트림 종료 SSE 프레임은 임포트 시점에 한 번만 직렬화
+_sse_formatter = SSEEventGenerator()
+_MESSAGE_DELTA_FRAMES = {
+    stop_reason: _sse_formatter._format_event(
+        "chat_message_delta",
+        {"type": "message_delta", "delta": {"stop_reason": stop_reason}},
+    )
+    for stop_reason in ("end_turn", "cancelled", "error")
+}
+_STREAM_END_FRAMES = {
+    end_type: _sse_formatter._format_event("stream_end", {"type": end_type})
+    for end_type in ("end", "cancelled", "error")
+}
+
+
+def _fallback_session_title(user_message: str) -> str:
+    """LLM 제목 생성 실패 시 사용자 메시지 앞부분으로 제목 생성"""
+    return (
+        user_message[:30].strip() + "..."
+        if len(user_message) > 30
+        else user_message.strip()
+    )
+
+
+def _get_title_cache_key(user_message: str, ai_response: str) -> str:
+    """제목 캐시 키 생성 (응답은 앞부분만 사용하여 적중률을 높임)"""
+    source = f"{user_message}\n{ai_response[:TITLE_CACHE_KEY_CHARS]}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
 async def generate_session_title(user_message: str, ai_response: str) -> str:
+    cache_key = _get_title_cache_key(user_message, ai_response)
+    cache_entry = _title_cache.get(cache_key)
+    if cache_entry and time.time() - cache_entry["timestamp"] < TITLE_CACHE_TTL:
+        logger.info(f"세션 제목 캐시 히트: {cache_key[:8]}...")
+        return cache_entry["title"]
+
     try:
         title_llm = ChatAnthropic(
             model_name="claude-3-5-haiku-20241022",
@@ -74,7 +131,7 @@ async def generate_session_title(user_message: str, ai_response: str) -> str:
         prompt = f"""다음 대화를 기반으로 짧고 명확한 세션 제목을 생성해주세요.
 
 사용자 질문: {user_message}
-AI 응답: {ai_response[:500]}...
+AI 응답: {ai_response[:TITLE_CONTEXT_CHARS]}...
 
 요구사항:
 1. 한국어로 작성
@@ -90,48 +147,40 @@ AI 응답: {ai_response[:500]}...
 
 제목만 응답하세요:"""
         response = await title_llm.ainvoke([HumanMessage(content=prompt)])
-        from app.utils.llm_response_parser import extract_text_from_anthropic_response
-
-        title = extract_text_from_anthropic_response(response).strip()
+        title = (
+            extract_text_from_anthropic_response(response).strip().strip('"').strip("'")
+        )
         if not title:
-            fallback_title = user_message[:30].strip()
-            if len(user_message) > 30:
-                fallback_title += "..."
-            return fallback_title
-        title = title.strip('"').strip("'")
-        if len(title) > 50:
-            title = title[:47] + "..."
+            return _fallback_session_title(user_message)
+        title = title if len(title) <= 50 else title[:47] + "..."
+
+        _title_cache[cache_key] = {"title": title, "timestamp": time.time()}
+        # 캐시 크기 제한 (오래된 항목부터 제거)
+        if len(_title_cache) > 200:
+            oldest = sorted(_title_cache, key=lambda k: _title_cache[k]["timestamp"])
+            for key in oldest[:100]:
+                del _title_cache[key]
         return title
     except Exception as e:
         logger.warning(f"세션 제목 자동 생성 실패: {e}")
-        fallback_title = user_message[:30].strip()
-        if len(user_message) > 30:
-            fallback_title += "..."
-        return fallback_title
-
-
-async def update_session_title(
-    session_uuid_str: str,
-    user_message: str,
-    ai_response: str,
-):
-    """세션 제목을 비동기적으로 생성하고 업데이트하는 백그라운드 작업"""
-    async with SessionLocal() as db:
-        try:
-            title = await generate_session_title(user_message, ai_response)
-            session_uuid = uuid.UUID(session_uuid_str)
-            session = await db.get(db_models.ChatSession, session_uuid)
-            if session:
-                setattr(session, "session_title", title)
-                await db.commit()
-                logger.info(
-                    f"세션(UUID: {session_uuid_str}) 제목 업데이트 완료: '{title}'"
-                )
-        except Exception as e:
-            logger.error(
-                f"세션(UUID: {session_uuid_str}) 제목 업데이트 실패: {e}", exc_info=True
+        return _fallback_session_title(user_message)
+
+
+async def _persist_session_title(
+    session_uuid: uuid.UUID, title_task: "asyncio.Task[str]"
+) -> None:
+    """생성된 세션 제목을 별도 세션에서 session_title 컬럼만 갱신하여 저장"""
+    try:
+        title = await title_task
+        async with SessionLocal.begin() as title_db:
+            await title_db.execute(
+                update(db_models.ChatSession)
+                .where(db_models.ChatSession.session_uuid == session_uuid)
+                .values(session_title=title)
             )
-            await db.rollback()
+        logger.info(f"세션 제목 저장 완료: {session_uuid}")
+    except Exception as e:
+        logger.warning(f"세션 제목 저장 실패: {e}")
 
 
 async def _extract_hscode_from_message(
@@ -164,8 +213,6 @@ async def _extract_hscode_from_message(
 사용자 메시지: "{message}"
 """
         response = await extractor_llm.ainvoke([HumanMessage(content=prompt)])
-        from app.utils.llm_response_parser import extract_text_from_anthropic_response
-
         content = extract_text_from_anthropic_response(response)
         json_match = re.search(r"\{.*\}", content, re.DOTALL)
         if not json_match:
@@ -187,7 +234,7 @@ class ChatService:
         self.cargo_tracking_service = CargoTrackingService()
         self.hscode_classification_service = HSCodeClassificationService()
         self.intent_classification_service = IntentClassificationService()
-        self.enhanced_detail_generator = EnhancedDetailGenerator()
+        self.enhanced_detail_generator = get_detail_generator()
         self.parallel_task_manager = ParallelTaskManager()
         self.sse_generator = SSEEventGenerator()
 
@@ -205,7 +252,7 @@ class ChatService:
     async def check_unified_intent(
         self, chat_request: ChatRequest
     ) -> Union[Dict[str, Any], None]:
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             intent_result = await self.intent_classification_service.classify_intent(
                 chat_request.message
@@ -222,7 +269,7 @@ class ChatService:
                         chat_request.message
                     )
                 )
-                processing_time_ms = int((time.time() - start_time) * 1000)
+                processing_time_ms = int((time.perf_counter() - start_time) * 1000)
                 if cargo_data:
                     response = (
                         await self.cargo_tracking_service.create_success_response(
@@ -270,9 +317,6 @@ class ChatService:
         List[BaseMessage],
         bool,
     ]:
-        from sqlalchemy.orm import selectinload
-        from sqlalchemy import select
-
         session_obj = await crud.chat.get_session_by_uuid(
             db=db, user_id=user_id, session_uuid_str=session_uuid_str
         )
@@ -280,8 +324,12 @@ class ChatService:
         # 세션에 메시지가 없는 경우, 즉 첫 대화인 경우 '새 세션'으로 간주하여 제목 생성
         is_new_session = not session_obj.messages
 
+        # selectinload로 이미 조회된 메시지를 초기 캐시로 전달하여 중복 SELECT 방지
         history = PostgresChatMessageHistory(
-            db=db, user_id=user_id, session=session_obj
+            db=db,
+            user_id=user_id,
+            session=session_obj,
+            preloaded_messages=session_obj.messages,
         )
         current_session_uuid = str(session_obj.session_uuid)
         previous_messages = await history.aget_messages()
@@ -311,6 +359,7 @@ class ChatService:
         is_new_session = False
         previous_messages: List[BaseMessage] = []
         disconnect_monitor: Optional[asyncio.Task] = None
+        title_task: Optional[asyncio.Task] = None
 
         # --- 단계별 상태 메시지 정의 ---
         steps = [
@@ -592,6 +641,25 @@ class ChatService:
             # 6. LLM 직접 스트리밍 처리 (cancellation 문제 해결)
             logger.info("🚀 LLM 스트리밍 시작 (안정화된 버전)...")
 
+            # 토큰마다 프레임을 보내지 않도록 짧은 구간의 델타 텍스트를 모아서 전송
+            pending_text = ""
+            last_flush = 0.0
+
+            # 델타 프레임은 텍스트만 달라지므로 앞뒤 고정 부분을 미리 만들어 두고
+            # 청크마다 dict를 만들지 않고 텍스트만 JSON 문자열로 직렬화해서 붙임
+            delta_frame_prefix = (
+                'event: chat_content_delta\ndata: {"type":"content_block_delta",'
+                f'"index":{content_index},"delta":{{"type":"text_delta","text":'
+            )
+            delta_frame_suffix = "}}\n\n"
+
+            def _delta_frame(text: str) -> str:
+                return (
+                    delta_frame_prefix
+                    + orjson.dumps(text).decode()
+                    + delta_frame_suffix
+                )
+
             try:
                 # 직접 astream 사용하여 스트리밍 (cancellation 내성)
                 async for chunk in chat_model.astream(messages):
@@ -621,19 +689,50 @@ class ChatService:
 
                         if content_text:
                             final_response_text += content_text
-                            logger.info(f"✅ 텍스트 스트림: '{content_text[:50]}...'")
+                            # 토큰마다 실행되는 로그이므로 레벨 확인 후에만 문자열 생성
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug(
+                                    f"✅ 텍스트 스트림: '{content_text[:50]}...'"
+                                )
 
-                            delta_event = {
-                                "type": "content_block_delta",
-                                "index": content_index,
-                                "delta": {"type": "text_delta", "text": content_text},
-                            }
-                            yield self.sse_generator._format_event(
-                                "chat_content_delta", delta_event
-                            )
+                            # 제목 생성은 응답 앞부분만 사용하므로, 충분히 누적되면
+                            # 스트리밍과 병행하여 미리 시작
+                            if (
+                                is_new_session
+                                and title_task is None
+                                and len(final_response_text) >= TITLE_CONTEXT_CHARS
+                            ):
+                                title_task = asyncio.create_task(
+                                    generate_session_title(
+                                        chat_request.message, final_response_text
+                                    )
+                                )
+
+                            pending_text += content_text
+                            now = time.monotonic()
+                            if (
+                                len(pending_text) >= DELTA_FLUSH_CHARS
+                                or now - last_flush >= DELTA_FLUSH_INTERVAL
+                            ):
+                                yield _delta_frame(pending_text)
+                                pending_text = ""
+                                last_flush = now
+                        elif pending_text:
+                            # 텍스트가 아닌 블록(도구 호출 등)이 오면 다음 텍스트까지
+                            # 지연될 수 있으므로 모아둔 텍스트를 바로 전송
+                            yield _delta_frame(pending_text)
+                            pending_text = ""
+                            last_flush = time.monotonic()
+
+                if pending_text:
+                    yield _delta_frame(pending_text)
+                    pending_text = ""
 
             except anthropic.APIConnectionError as e:
                 logger.error(f"Anthropic API 연결 오류: {e}")
+                if pending_text:
+                    yield _delta_frame(pending_text)
+                    pending_text = ""
                 error_text = (
                     "일시적인 네트워크 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
                 )
@@ -647,6 +746,9 @@ class ChatService:
                 )
             except anthropic.RateLimitError as e:
                 logger.error(f"Anthropic API 요청 한도 초과: {e}")
+                if pending_text:
+                    yield _delta_frame(pending_text)
+                    pending_text = ""
                 error_text = (
                     "요청이 많아 처리가 지연되고 있습니다. 잠시 후 다시 시도해주세요."
                 )
@@ -661,6 +763,9 @@ class ChatService:
             except asyncio.CancelledError:
                 # CancelledError를 잡아서 무시하고 부분 응답이라도 완료 처리
                 logger.warning("LLM 스트리밍이 취소되었지만 부분 응답을 유지합니다.")
+                if pending_text:
+                    yield _delta_frame(pending_text)
+                    pending_text = ""
                 if final_response_text:
                     completion_text = "\n\n[네트워크 이슈로 응답이 중단되었지만 가능한 정보를 제공했습니다]"
                     yield self.sse_generator._format_event(
@@ -673,6 +778,9 @@ class ChatService:
                     )
             except Exception as stream_error:
                 logger.error(f"LLM 스트리밍 실패: {stream_error}")
+                if pending_text:
+                    yield _delta_frame(pending_text)
+                    pending_text = ""
 
                 # 폴백: 일반 invoke 사용
                 logger.info("🔄 폴백 모드: invoke 사용...")
@@ -719,7 +827,11 @@ class ChatService:
                                 yield self.sse_generator._format_event(
                                     "chat_content_delta", delta_event
                                 )
-                                await asyncio.sleep(0.05)  # 스트리밍 효과
+                                if settings.FALLBACK_STREAM_DELAY_MS:
+                                    # 스트리밍 효과 (설정된 경우에만)
+                                    await asyncio.sleep(
+                                        settings.FALLBACK_STREAM_DELAY_MS / 1000
+                                    )
                 except Exception as fallback_error:
                     logger.error(f"폴백 모드도 실패: {fallback_error}")
                     error_text = (
@@ -758,25 +870,30 @@ class ChatService:
                     ai_message = AIMessage(content=final_response_text)
                     await history.aadd_message(ai_message)
 
-                    if is_new_session and session_obj:
-                        background_tasks.add_task(
-                            update_session_title,
-                            str(session_obj.session_uuid),
-                            chat_request.message,
-                            final_response_text,
-                        )
-
                     await db.commit()
                     logger.info("대화 내용이 성공적으로 저장되었습니다.")
+
+                    # 제목 생성/저장은 스트림 종료를 막지 않도록 백그라운드에서 처리
+                    # (세션이 커밋된 뒤에 UPDATE 되도록 커밋 이후에 예약)
+                    if is_new_session and session_obj:
+                        if title_task is None:
+                            title_task = asyncio.create_task(
+                                generate_session_title(
+                                    chat_request.message, final_response_text
+                                )
+                            )
+                        persist_task = asyncio.create_task(
+                            _persist_session_title(session_obj.session_uuid, title_task)
+                        )
+                        _background_tasks.add(persist_task)
+                        persist_task.add_done_callback(_background_tasks.discard)
+                        title_task = None
                 except Exception as db_error:
                     logger.error(f"대화 내용 저장 실패: {db_error}", exc_info=True)
                     await db.rollback()
 
-            yield self.sse_generator._format_event(
-                "chat_message_delta",
-                {"type": "message_delta", "delta": {"stop_reason": "end_turn"}},
-            )
-            yield self.sse_generator._format_event("stream_end", {"type": "end"})
+            yield _MESSAGE_DELTA_FRAMES["end_turn"]
+            yield _STREAM_END_FRAMES["end"]
 
         except asyncio.CancelledError:
             logger.info("채팅 스트림 처리가 취소되었습니다.")
@@ -793,11 +910,8 @@ class ChatService:
                 "chat_content_stop",
                 {"type": "content_block_stop", "index": content_index},
             )
-            yield self.sse_generator._format_event(
-                "chat_message_delta",
-                {"type": "message_delta", "delta": {"stop_reason": "cancelled"}},
-            )
-            yield self.sse_generator._format_event("stream_end", {"type": "cancelled"})
+            yield _MESSAGE_DELTA_FRAMES["cancelled"]
+            yield _STREAM_END_FRAMES["cancelled"]
         except Exception as e:
             logger.error(f"채팅 스트림 처리 중 치명적 오류 발생: {e}", exc_info=True)
             await db.rollback()
@@ -814,12 +928,13 @@ class ChatService:
                 "chat_content_stop",
                 {"type": "content_block_stop", "index": content_index},
             )
-            yield self.sse_generator._format_event(
-                "chat_message_delta",
-                {"type": "message_delta", "delta": {"stop_reason": "error"}},
-            )
-            yield self.sse_generator._format_event("stream_end", {"type": "error"})
+            yield _MESSAGE_DELTA_FRAMES["error"]
+            yield _STREAM_END_FRAMES["error"]
         finally:
+            # 저장 단계에 도달하지 못한 경우 미리 시작한 제목 생성 작업 정리
+            if title_task and not title_task.done():
+                title_task.cancel()
+
             # 클라이언트 연결 모니터링 작업 정리
             if disconnect_monitor and not disconnect_monitor.done():
                 disconnect_monitor.cancel()
@@ -845,7 +960,7 @@ class ChatService:
         (이벤트 타입, 데이터) 튜플을 반환.
         """
         is_tool_running = False
-        last_event_time = time.time()
+        last_event_time = time.perf_counter()
         active_tool_calls: Dict[str, Dict] = {}
         retry_count = 0
 
@@ -942,7 +1057,7 @@ class ChatService:
 
                         # 추출된 텍스트가 있으면 전송
                         if text_content and text_content.strip():
-                            last_event_time = time.time()
+                            last_event_time = time.perf_counter()
                             logger.info(
                                 f"🚀 최종 텍스트 전송 (길이: {len(text_content)}): '{text_content[:100]}...'"
                             )
@@ -960,7 +1075,7 @@ class ChatService:
 
                         if tool_name == "web_search":
                             is_tool_running = True
-                            last_event_time = time.time()
+                            last_event_time = time.perf_counter()
                             active_tool_calls[run_id] = {
                                 "name": tool_name,
                                 "input": tool_input,
@@ -979,7 +1094,7 @@ class ChatService:
 
                         if tool_name == "web_search":
                             is_tool_running = bool(active_tool_calls)
-                            last_event_time = time.time()
+                            last_event_time = time.perf_counter()
                             urls = []
 
                             if isinstance(output, str):
@@ -1020,7 +1135,7 @@ class ChatService:
                             }
 
                     # 하트비트 체크
-                    if time.time() - last_event_time > heartbeat_interval:
+                    if time.perf_counter() - last_event_time > heartbeat_interval:
                         if is_tool_running:
                             message = "외부 도구(웹 검색 등)를 사용하여 정보를 탐색하고 있습니다. 최대 3분까지 소요될 수 있습니다."
                         else:
@@ -1033,7 +1148,7 @@ class ChatService:
                             is_sub_step=True,
                         )
                         yield "heartbeat", event_str
-                        last_event_time = time.time()
+                        last_event_time = time.perf_counter()
 
                 # 성공적으로 완료되면 루프 종료
                 break
@@ -1,25 +1,123 @@
 import asyncio
+import functools
 import hashlib
 import logging
 import re
 import time
-from typing import List, Optional, Dict, Any
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime
-
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import (
+    case,
+    exists,
+    func,
+    insert,
+    literal,
+    null,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.db.session import SessionLocal
 from app.models.schemas import DetailPageInfo, DetailButton
-from app.models.db_models import DetailPageAnalysis, DetailPageButton
-from app.services.enhanced_detail_generator import EnhancedDetailGenerator
+from app.models.db_models import ChatSession, DetailPageAnalysis, DetailPageButton
+from app.services.enhanced_detail_generator import get_detail_generator
 
 logger = logging.getLogger(__name__)
 
+# 백그라운드 DB 저장 워커 수 (커넥션 풀의 대부분은 포그라운드 요청용으로 남겨둠)
+BACKGROUND_SAVE_CONCURRENCY = max(1, settings.DB_POOL_SIZE // 4)
+# 대기 중인 백그라운드 저장 작업 최대 개수
+SAVE_QUEUE_MAXSIZE = 256
+# 워커가 한 트랜잭션에 모아 저장하는 최대 작업 수
+SAVE_BATCH_SIZE = 50
+# 첫 작업을 꺼낸 뒤 같은 배치에 담을 작업을 기다리는 최대 시간 (초)
+SAVE_BATCH_LINGER_SECONDS = 0.05
+# 앱 종료 시 남은 저장 작업을 기다리는 최대 시간 (초)
+SAVE_DRAIN_TIMEOUT_SECONDS = 10.0
+
+# 저장된 상세 정보 조회 시 가져오는 필드 (원문 메시지 등 불필요한 컬럼 제외)
+ENHANCED_INFO_FIELDS = {
+    "tariff_info": DetailPageAnalysis.tariff_info,
+    "trade_agreement_info": DetailPageAnalysis.trade_agreement_info,
+    "regulation_info": DetailPageAnalysis.regulation_info,
+    "non_tariff_info": DetailPageAnalysis.non_tariff_info,
+    "similar_hscodes_detailed": DetailPageAnalysis.similar_hscodes_detailed,
+    "market_analysis": DetailPageAnalysis.market_analysis,
+    "verification_status": DetailPageAnalysis.verification_status,
+    "data_quality_score": DetailPageAnalysis.data_quality_score,
+    "last_verified_at": DetailPageAnalysis.last_verified_at,
+    "expert_opinion": DetailPageAnalysis.expert_opinion,
+    "analysis_id": DetailPageAnalysis.id,
+    "created_at": DetailPageAnalysis.created_at,
+}
+
+# 응답 dict를 Postgres에서 하나의 JSONB 객체로 만들어 한 번에 역직렬화
+# (JSONB 컬럼별 디코딩과 datetime 변환을 파이썬에서 반복하지 않음)
+_ENHANCED_INFO_OBJECT = func.jsonb_build_object(
+    *(part for name, column in ENHANCED_INFO_FIELDS.items() for part in (name, column)),
+    type_=JSONB,
+).label("enhanced_info")
+
+# 분석 결과 INSERT 시 사용할 수 있는 컬럼 이름
+_ANALYSIS_COLUMNS = frozenset(DetailPageAnalysis.__table__.columns.keys())
+
+
+def build_enhanced_analysis_values(enhanced_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    상세 정보 생성 결과를 DetailPageAnalysis 컬럼 값으로 변환.
+    테이블에 없는 키는 제외하고, 생성 메타데이터는 analysis_metadata에 저장함.
+    """
+    values = {
+        key: value for key, value in enhanced_info.items() if key in _ANALYSIS_COLUMNS
+    }
+    if "generation_metadata" in enhanced_info:
+        values["analysis_metadata"] = enhanced_info["generation_metadata"]
+    return values
+
 
 class DetailPageService:
     """상세페이지 정보 준비 서비스"""
 
-    def __init__(self):
-        self.enhanced_detail_generator = EnhancedDetailGenerator()
+    # 요청마다 달라지는 것은 query_params 뿐이므로 버튼 원형은 한 번만 생성
+    _BUTTON_PROTOTYPES: ClassVar[Tuple[DetailButton, ...]] = (
+        DetailButton(
+            type="link",
+            label="관세청 법령정보",
+            url="https://unipass.customs.go.kr/clip/index.do",
+            priority=1,
+        ),
+        DetailButton(
+            type="link",
+            label="TradeNAVI",
+            url="https://www.tradenavi.or.kr/web/main.do",
+            priority=2,
+        ),
+        DetailButton(
+            type="action",
+            label="AI 유사사례 분석",
+            action="ANALYZE_SIMILAR_CASES",
+            priority=3,
+        ),
+        DetailButton(
+            type="action",
+            label="AI 리포트 생성",
+            action="GENERATE_AI_REPORT",
+            priority=4,
+        ),
+    )
+
+    def __init__(self, sessionmaker: async_sessionmaker = SessionLocal):
+        self.enhanced_detail_generator = get_detail_generator()
+        # 백그라운드 저장 전용 세션 팩토리와 저장 큐
+        # (고정된 수의 워커만 저장을 수행하여 포그라운드 요청의 커넥션을 보호)
+        self._sessionmaker = sessionmaker
+        self._save_queue: Optional[asyncio.Queue] = None
+        self._save_workers: List[asyncio.Task] = []
 
     async def prepare_detail_page_info(
         self,
@@ -31,14 +129,14 @@ class DetailPageService:
         product_name: Optional[str] = None,
     ) -> DetailPageInfo:
         """HSCode를 기반으로 상세페이지 정보를 준비"""
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         if not override_hscode:
             logger.info("상세 정보 준비 건너뛰기: HSCode가 제공되지 않았습니다.")
             return DetailPageInfo(
                 detected_intent="general_chat",
                 analysis_source="skipped",
-                processing_time_ms=int((time.time() - start_time) * 1000),
+                processing_time_ms=int((time.perf_counter() - start_time) * 1000),
             )
 
         logger.info(
@@ -46,6 +144,7 @@ class DetailPageService:
         )
 
         try:
+            # 동시 요청 공유와 항목별 결과 캐시는 생성기에서 처리함
             enhanced_info = (
                 await self.enhanced_detail_generator.generate_comprehensive_detail_info(
                     hscode=override_hscode,
@@ -56,7 +155,7 @@ class DetailPageService:
             )
 
             detail_buttons = self._generate_detail_buttons([override_hscode])
-            processing_time = int((time.time() - start_time) * 1000)
+            processing_time = int((time.perf_counter() - start_time) * 1000)
 
             detail_page_info = DetailPageInfo(
                 hscode=override_hscode,
@@ -68,17 +167,15 @@ class DetailPageService:
             )
 
             if db and enhanced_info:
+                # 같은 message_hash의 중복 저장은 INSERT의 NOT EXISTS 조건이 막음
                 message_hash = self._get_message_hash(f"{override_hscode}:{message}")
-                asyncio.create_task(
-                    self._save_analysis_with_enhanced_info_to_db(
-                        message=message,
-                        message_hash=message_hash,
-                        session_uuid=session_uuid,
-                        user_id=user_id,
-                        analysis_info=detail_page_info,
-                        enhanced_info=enhanced_info,
-                        db=db,
-                    )
+                self._enqueue_save(
+                    message=message,
+                    message_hash=message_hash,
+                    session_uuid=session_uuid,
+                    user_id=user_id,
+                    analysis_info=detail_page_info,
+                    enhanced_info=enhanced_info,
                 )
             return detail_page_info
 
@@ -87,7 +184,7 @@ class DetailPageService:
             return DetailPageInfo(
                 hscode=override_hscode,
                 detected_intent="hscode_search",
-                processing_time_ms=int((time.time() - start_time) * 1000),
+                processing_time_ms=int((time.perf_counter() - start_time) * 1000),
                 analysis_source="error",
                 error_message=f"상세 정보 생성 중 오류 발생: {e}",
             )
@@ -103,7 +200,7 @@ class DetailPageService:
 
         try:
             stmt = (
-                select(DetailPageAnalysis)
+                select(_ENHANCED_INFO_OBJECT)
                 .where(
                     DetailPageAnalysis.detected_hscode == hscode,
                     DetailPageAnalysis.verification_status.in_(
@@ -115,34 +212,7 @@ class DetailPageService:
             )
 
             result = await db.execute(stmt)
-            analysis = result.scalars().first()
-
-            if not analysis:
-                return None
-
-            enhanced_info = {
-                "tariff_info": getattr(analysis, "tariff_info", {}),
-                "trade_agreement_info": getattr(analysis, "trade_agreement_info", {}),
-                "regulation_info": getattr(analysis, "regulation_info", {}),
-                "non_tariff_info": getattr(analysis, "non_tariff_info", {}),
-                "similar_hscodes_detailed": getattr(
-                    analysis, "similar_hscodes_detailed", {}
-                ),
-                "market_analysis": getattr(analysis, "market_analysis", {}),
-                "verification_status": getattr(
-                    analysis, "verification_status", "unknown"
-                ),
-                "data_quality_score": getattr(analysis, "data_quality_score", 0.0),
-                "last_verified_at": getattr(analysis, "last_verified_at", None),
-                "expert_opinion": getattr(analysis, "expert_opinion", None),
-                "analysis_id": analysis.id,
-                "created_at": (
-                    analysis.created_at.isoformat()
-                    if analysis.created_at is not None
-                    else None
-                ),
-            }
-            return enhanced_info
+            return result.scalar()
         except Exception as e:
             logger.error(f"상세 정보 조회 중 오류: {e}")
             return None
@@ -161,28 +231,30 @@ class DetailPageService:
             return False
 
         try:
-            stmt = select(DetailPageAnalysis).where(
-                DetailPageAnalysis.id == analysis_id
-            )
-
-            result = await db.execute(stmt)
-            analysis = result.scalars().first()
-
-            if not analysis:
-                return False
-
-            setattr(analysis, "verification_status", new_status)
-            setattr(analysis, "last_verified_at", datetime.utcnow())
-
+            values: Dict[str, Any] = {
+                "verification_status": new_status,
+                "last_verified_at": datetime.now(timezone.utc),
+            }
             if expert_opinion:
-                setattr(analysis, "expert_opinion", expert_opinion)
+                values["expert_opinion"] = expert_opinion
 
             if new_status == "verified":
-                setattr(analysis, "data_quality_score", 1.0)
-                setattr(analysis, "needs_update", False)
+                values["data_quality_score"] = 1.0
+                values["needs_update"] = False
             elif new_status == "rejected":
-                setattr(analysis, "data_quality_score", 0.0)
-                setattr(analysis, "needs_update", True)
+                values["data_quality_score"] = 0.0
+                values["needs_update"] = True
+
+            # 행 전체(JSONB 컬럼 포함)를 읽지 않고 UPDATE ... RETURNING 한 번으로 처리
+            stmt = (
+                update(DetailPageAnalysis)
+                .where(DetailPageAnalysis.id == analysis_id)
+                .values(**values)
+                .returning(DetailPageAnalysis.id)
+            )
+            result = await db.execute(stmt)
+            if result.scalar_one_or_none() is None:
+                return False
 
             await db.commit()
             logger.info(
@@ -196,129 +268,244 @@ class DetailPageService:
             return False
 
     def _get_message_hash(self, message: str) -> str:
-        """메시지의 SHA256 해시 생성"""
-        return hashlib.sha256(message.encode("utf-8")).hexdigest()
+        """메시지의 BLAKE2b-128 해시 생성 (중복 판별용 키, 32자 hex)"""
+        return hashlib.blake2b(message.encode("utf-8"), digest_size=16).hexdigest()
+
+    def start_save_workers(self) -> None:
+        """백그라운드 저장 큐와 워커 시작 (앱 시작 시 호출, 이미 실행 중이면 무시)"""
+        if self._save_queue is not None:
+            return
+        self._save_queue = asyncio.Queue(maxsize=SAVE_QUEUE_MAXSIZE)
+        self._save_workers = [
+            asyncio.create_task(self._save_worker(self._save_queue))
+            for _ in range(BACKGROUND_SAVE_CONCURRENCY)
+        ]
+        logger.info(f"백그라운드 저장 워커 시작: {BACKGROUND_SAVE_CONCURRENCY}개")
+
+    async def stop_save_workers(self) -> None:
+        """남은 저장 작업을 처리한 뒤 워커 종료 (앱 종료 시 호출)"""
+        if self._save_queue is None:
+            return
+        queue, workers = self._save_queue, self._save_workers
+        self._save_queue, self._save_workers = None, []
+
+        try:
+            await asyncio.wait_for(queue.join(), SAVE_DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"백그라운드 저장 작업 {queue.qsize()}건을 처리하지 못하고 종료합니다."
+            )
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        logger.info("백그라운드 저장 워커 종료")
+
+    def _enqueue_save(self, **save_kwargs: Any) -> None:
+        """백그라운드 저장 작업을 큐에 등록 (큐가 가득 차면 저장을 건너뜀)"""
+        if self._save_queue is None:
+            # 앱 수명 주기 밖(스크립트 등)에서 호출된 경우 워커를 바로 시작
+            self.start_save_workers()
+
+        try:
+            self._save_queue.put_nowait(save_kwargs)
+        except asyncio.QueueFull:
+            logger.warning(
+                f"백그라운드 저장 큐가 가득 차 저장을 건너뜁니다: "
+                f"{save_kwargs['message_hash'][:8]}..."
+            )
+
+    async def _save_worker(self, queue: asyncio.Queue) -> None:
+        """공유 큐에 쌓인 저장 작업을 모아 한 트랜잭션으로 처리하는 워커"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # 요청이 몰릴 때 여러 작업이 한 커밋으로 묶이도록 잠시 더 수집
+            deadline = loop.time() + SAVE_BATCH_LINGER_SECONDS
+            while len(batch) < SAVE_BATCH_SIZE:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._save_batch_to_db(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _save_batch_to_db(self, batch: List[Dict[str, Any]]) -> None:
+        """여러 저장 작업을 한 번의 커밋으로 저장 (실패 시 작업별로 다시 저장)"""
+        if len(batch) == 1:
+            await self._save_analysis_with_enhanced_info_to_db(**batch[0])
+            return
+
+        try:
+            async with self._sessionmaker.begin() as bg_db:
+                inserted = [
+                    await self._insert_analysis(bg_db, **save_kwargs)
+                    for save_kwargs in batch
+                ]
+        except Exception as e:
+            logger.warning(f"상세 분석 결과 일괄 저장 실패, 개별 저장으로 재시도: {e}")
+            for save_kwargs in batch:
+                await self._save_analysis_with_enhanced_info_to_db(**save_kwargs)
+            return
+
+        logger.info(f"상세 분석 결과 일괄 저장 완료: {sum(inserted)}/{len(batch)}건")
+
+    async def _save_analysis_with_enhanced_info_to_db(self, **save_kwargs: Any) -> None:
+        """분석 결과와 상세 정보를 DB에 저장 (백그라운드 작업)"""
+        message_hash = save_kwargs["message_hash"]
+        try:
+            logger.info(f"상세 분석 결과 DB 저장 시작: {message_hash[:8]}...")
+
+            # begin()은 블록 종료 시 커밋(예외 시 롤백)까지 처리함
+            async with self._sessionmaker.begin() as bg_db:
+                was_inserted = await self._insert_analysis(bg_db, **save_kwargs)
+
+            if was_inserted:
+                logger.info(f"상세 분석 결과 DB 저장 완료: {message_hash[:8]}...")
 
-    async def _save_analysis_with_enhanced_info_to_db(
+        except Exception as e:
+            logger.error(f"상세 분석 결과 DB 저장 실패: {e}", exc_info=True)
+
+    async def _insert_analysis(
         self,
+        bg_db: AsyncSession,
         message: str,
         message_hash: str,
         session_uuid: str,
         user_id: Optional[int],
         analysis_info: DetailPageInfo,
         enhanced_info: Dict[str, Any],
-        db: AsyncSession,
-    ) -> None:
-        """분석 결과와 상세 정보를 DB에 저장 (백그라운드 작업)"""
-        try:
-            logger.info(f"상세 분석 결과 DB 저장 시작: {message_hash[:8]}...")
-            from app.db.session import SessionLocal
-
-            async with SessionLocal() as bg_db:
-                valid_session_uuid = None
-                if session_uuid:
-                    try:
-                        from uuid import UUID
-                        from app.models.db_models import ChatSession
-
-                        stmt = (
-                            select(ChatSession.session_uuid)
-                            .where(ChatSession.session_uuid == UUID(session_uuid))
-                            .limit(1)
-                        )
-                        result = await bg_db.execute(stmt)
-                        if result.scalar_one_or_none():
-                            valid_session_uuid = session_uuid
-                    except Exception as e:
-                        logger.warning(f"세션 UUID 확인 중 오류: {e}")
-
-                analysis = DetailPageAnalysis(
-                    user_id=user_id,
-                    session_uuid=valid_session_uuid,
-                    message_hash=message_hash,
-                    original_message=message,
-                    detected_intent=analysis_info.detected_intent,
-                    detected_hscode=analysis_info.hscode,
-                    confidence_score=analysis_info.confidence_score,
-                    processing_time_ms=analysis_info.processing_time_ms,
-                    analysis_source=analysis_info.analysis_source,
-                    web_search_performed=False,
-                    verification_status="ai_generated",
-                    data_quality_score=enhanced_info.get("data_quality_score", 0.7),
-                    **enhanced_info,
-                )
-                bg_db.add(analysis)
-                await bg_db.flush()
-
-                for button in analysis_info.detail_buttons:
-                    button_obj = DetailPageButton(
-                        analysis_id=analysis.id,
-                        button_type=button.type,
-                        label=button.label,
-                        url=button.url,
-                        action=button.action,
-                        query_params=button.query_params,
-                        priority=button.priority,
-                        is_active=True,
-                    )
-                    bg_db.add(button_obj)
-
-                await bg_db.commit()
-                logger.info(f"상세 분석 결과 DB 저장 완료: {message_hash[:8]}...")
+    ) -> bool:
+        """
+        주어진 트랜잭션 안에서 분석 결과와 버튼을 INSERT.
+        같은 message_hash가 이미 저장되어 있으면 False를 반환함.
+        """
+        valid_session_uuid = None
+        if session_uuid:
+            try:
+                valid_session_uuid = UUID(session_uuid)
+            except ValueError:
+                logger.warning(f"잘못된 세션 UUID 형식: {session_uuid}")
+
+        values = {
+            "user_id": user_id,
+            "message_hash": message_hash,
+            "original_message": message,
+            "detected_intent": analysis_info.detected_intent,
+            "detected_hscode": analysis_info.hscode,
+            "confidence_score": analysis_info.confidence_score,
+            "processing_time_ms": analysis_info.processing_time_ms,
+            "analysis_source": analysis_info.analysis_source,
+            "web_search_performed": False,
+            "verification_status": "ai_generated",
+            "data_quality_score": 0.7,
+            **build_enhanced_analysis_values(enhanced_info),
+        }
+
+        stmt = self._build_insert_with_optional_fk(values, valid_session_uuid)
+        if analysis_info.detail_buttons:
+            # 버튼은 분석 결과 INSERT와 한 문장으로 저장하여 DB 왕복을 한 번으로 줄임
+            stmt = self._build_insert_with_buttons(stmt, analysis_info.detail_buttons)
+
+        result = await bg_db.execute(stmt)
+        if result.first() is None:
+            logger.info(f"이미 저장된 상세 분석 결과: {message_hash[:8]}...")
+            return False
+        return True
 
-        except Exception as e:
-            logger.error(f"상세 분석 결과 DB 저장 실패: {e}", exc_info=True)
+    @staticmethod
+    def _build_insert_with_optional_fk(
+        values: Dict[str, Any], session_uuid: Optional[UUID]
+    ):
+        """
+        분석 결과 INSERT 문 생성.
+        세션이 존재할 때만 session_uuid를 연결하도록 EXISTS 조건을 INSERT에 포함하여
+        별도의 존재 확인 조회나 FK 오류 후 재시도 없이 한 번에 저장함.
+        같은 message_hash가 이미 저장되어 있으면 아무 행도 넣지 않음 (RETURNING 없음).
+        """
+        table = DetailPageAnalysis.__table__
+        row = {key: literal(value, table.c[key].type) for key, value in values.items()}
+        if session_uuid is None:
+            row["session_uuid"] = null()
+        else:
+            row["session_uuid"] = case(
+                (
+                    exists().where(ChatSession.session_uuid == session_uuid),
+                    literal(session_uuid, ChatSession.session_uuid.type),
+                ),
+                else_=null(),
+            )
+
+        # message_hash에 유니크 제약이 없어 ON CONFLICT 대신 NOT EXISTS로 중복 저장 방지
+        source = select(*(expr.label(key) for key, expr in row.items())).where(
+            ~exists().where(DetailPageAnalysis.message_hash == values["message_hash"])
+        )
+        return (
+            insert(DetailPageAnalysis)
+            .from_select(list(row), source)
+            .returning(DetailPageAnalysis.id)
+        )
+
+    @staticmethod
+    def _build_insert_with_buttons(analysis_insert, buttons: List[DetailButton]):
+        """
+        분석 결과 INSERT ... RETURNING을 CTE로 감싸 버튼 INSERT와 한 문장으로 생성.
+        분석 결과가 중복으로 저장되지 않으면 버튼도 저장되지 않음 (RETURNING 없음).
+        """
+        new_analysis = analysis_insert.cte("new_analysis")
+        table = DetailPageButton.__table__
+        rows = [
+            {
+                "button_type": button.type,
+                "label": button.label,
+                "url": button.url or "",
+                "query_params": button.query_params or {},
+                "priority": button.priority,
+                "is_active": True,
+            }
+            for button in buttons
+        ]
+        source = union_all(
+            *(
+                select(
+                    new_analysis.c.id,
+                    *(literal(value, table.c[key].type) for key, value in row.items()),
+                )
+                for row in rows
+            )
+        )
+        return (
+            insert(DetailPageButton)
+            .from_select(["analysis_id", *rows[0]], source)
+            .returning(DetailPageButton.analysis_id)
+        )
 
     def _generate_detail_buttons(
         self, hscode_patterns: List[str]
     ) -> List[DetailButton]:
         """HSCode 패턴 목록으로부터 상세페이지 버튼 목록을 생성합니다."""
-        buttons = []
         if not hscode_patterns:
-            return buttons
+            return []
 
         main_hscode = hscode_patterns[0]
-
-        button_templates = [
-            {
-                "type": "link",
-                "label": "관세청 법령정보",
-                "url": "https://unipass.customs.go.kr/clip/index.do",
-                "query_params": {"hscode": main_hscode},
-                "priority": 1,
-            },
-            {
-                "type": "link",
-                "label": "TradeNAVI",
-                "url": "https://www.tradenavi.or.kr/web/main.do",
-                "query_params": {"hscode": main_hscode},
-                "priority": 2,
-            },
-            {
-                "type": "action",
-                "label": "AI 유사사례 분석",
-                "action": "ANALYZE_SIMILAR_CASES",
-                "query_params": {"hscode": main_hscode},
-                "priority": 3,
-            },
-            {
-                "type": "action",
-                "label": "AI 리포트 생성",
-                "action": "GENERATE_AI_REPORT",
-                "query_params": {"hscode": main_hscode},
-                "priority": 4,
-            },
+        return [
+            proto.model_copy(update={"query_params": {"hscode": main_hscode}})
+            for proto in self._BUTTON_PROTOTYPES
         ]
 
-        for template in button_templates:
-            buttons.append(
-                DetailButton(
-                    type=template["type"],
-                    label=template["label"],
-                    url=template.get("url"),
-                    action=template.get("action"),
-                    query_params=template.get("query_params"),
-                    priority=template["priority"],
-                )
-            )
-        return buttons
+
+@functools.lru_cache(maxsize=1)
+def get_detail_page_service() -> DetailPageService:
+    """
+    DetailPageService 공유 인스턴스.
+    저장 큐와 워커가 프로세스에 하나만 존재하도록 요청마다 새로 만들지 않음.
+    """
+    return DetailPageService()
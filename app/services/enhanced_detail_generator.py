@@ -4,15 +4,17 @@ HSCode 파악 시 상세페이지에 필요한 모든 정보를 생성하는 고
 """
 
 import asyncio
-import json
+import copy
+import functools
+import hashlib
 import logging
 import time
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Type
+from datetime import datetime, timezone
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import SystemMessage, HumanMessage
-from pydantic import SecretStr
+import orjson
+from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
+from pydantic import BaseModel, Field, SecretStr, ValidationError
 
 from app.core.config import settings
 
@@ -21,333 +23,156 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 
-class EnhancedDetailGenerator:
-    """상세페이지 정보 생성 서비스 - AI 기반 종합 분석"""
-
-    def __init__(self):
-        # 하드코딩된 ChatAnthropic 모델
-        from langchain_anthropic import ChatAnthropic
-        from pydantic import SecretStr
-
-        self.llm = ChatAnthropic(
-            model_name=settings.ANTHROPIC_MODEL,
-            api_key=SecretStr(settings.ANTHROPIC_API_KEY),
-            temperature=1,
-            max_tokens_to_sample=15_000,
-            timeout=1200.0,
-            max_retries=5,
-            streaming=True,
-            stop=None,
-            default_headers={
-                "anthropic-beta": "extended-cache-ttl-2025-04-11",
-                "anthropic-version": "2023-06-01",
-            },
-            thinking={"type": "enabled", "budget_tokens": 6_000},
-        )
-        # self.web_search_service = WebSearchService() # 이 줄을 삭제합니다.
-
-        # 주요 수출입 대상국
-        self.major_countries = {
-            "KR": "한국",
-            "CN": "중국",
-            "US": "미국",
-            "JP": "일본",
-            "VN": "베트남",
-            "DE": "독일",
-            "TH": "태국",
-            "IN": "인도",
-        }
-
-    async def generate_comprehensive_detail_info(
-        self, hscode: str, product_description: str, user_context: str, db_session=None
-    ) -> Dict[str, Any]:
-        """
-        HSCode에 대한 종합적인 상세 정보 생성
-
-        Args:
-            hscode: HSCode (예: "8517.12.00")
-            product_description: 제품 설명
-            user_context: 사용자 질문 맥락
-            db_session: 데이터베이스 세션 (웹 검색 캐싱용)
-
-        Returns:
-            상세 정보가 담긴 딕셔너리
-        """
-        start_time = time.time()
-        logger.info(f"Starting comprehensive detail generation for HSCode: {hscode}")
-
-        try:
-            # 병렬로 여러 정보 생성
-            tasks = [
-                self._generate_tariff_info(
-                    hscode, product_description
-                ),  # db_session 제거
-                self._generate_trade_agreement_info(
-                    hscode, product_description
-                ),  # db_session 제거
-                self._generate_regulation_info(
-                    hscode, product_description
-                ),  # db_session 제거
-                self._generate_non_tariff_info(
-                    hscode, product_description
-                ),  # db_session 제거
-                self._generate_similar_hscodes(hscode, product_description),
-                self._generate_market_analysis(
-                    hscode, product_description
-                ),  # db_session 제거
-            ]
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # 결과 조합
-            detail_info = {
-                "tariff_info": (
-                    results[0] if not isinstance(results[0], Exception) else {}
-                ),
-                "trade_agreement_info": (
-                    results[1] if not isinstance(results[1], Exception) else {}
-                ),
-                "regulation_info": (
-                    results[2] if not isinstance(results[2], Exception) else {}
-                ),
-                "non_tariff_info": (
-                    results[3] if not isinstance(results[3], Exception) else {}
-                ),
-                "similar_hscodes_detailed": (
-                    results[4] if not isinstance(results[4], Exception) else {}
-                ),
-                "market_analysis": (
-                    results[5] if not isinstance(results[5], Exception) else {}
-                ),
-                "verification_status": "ai_generated",
-                "data_quality_score": self._calculate_quality_score(results),
-                "needs_update": False,
-                "last_verified_at": datetime.utcnow().isoformat(),
-                "expert_opinion": None,
-                "generation_metadata": {
-                    "generation_time_ms": int((time.time() - start_time) * 1000),
-                    "ai_model": "claude-3-5-sonnet-20241022",
-                    "generation_method": "comprehensive_parallel",
-                    "data_sources": ["ai_analysis", "web_search"],
-                    "quality_indicators": self._get_quality_indicators(results),
-                },
+def _cached_system_message(text: str) -> SystemMessage:
+    """정적 지시문/스키마를 프롬프트 캐시 대상 시스템 메시지로 생성 (1시간 TTL)"""
+    return SystemMessage(
+        content=[
+            {
+                "type": "text",
+                "text": text,
+                "cache_control": {"type": "ephemeral", "ttl": "1h"},
             }
+        ]
+    )
 
-            logger.info(
-                f"Detail generation completed in {detail_info['generation_metadata']['generation_time_ms']}ms"
-            )
-            return detail_info
-
-        except Exception as e:
-            logger.error(
-                f"Error generating comprehensive detail info: {e}", exc_info=True
-            )
-            return self._get_fallback_detail_info(hscode, product_description)
-
-    async def _generate_tariff_info(
-        self, hscode: str, product_description: str
-    ) -> Dict[str, Any]:
-        """관세율 정보 생성"""
-
-        prompt = f"""You are a trade expert specializing in tariff analysis. Generate comprehensive tariff information for HSCode {hscode} ({product_description}).
 
-Provide detailed tariff information in the following JSON structure. Your response MUST be only the JSON object, without any additional text, explanations, or markdown formatting.
+# 상세 정보 항목별 정적 프롬프트 (HSCode와 제품 설명만 요청마다 달라지므로 캐시됨)
+_TARIFF_SYSTEM_MESSAGE = _cached_system_message(
+    """Provide detailed tariff information in the following JSON structure. Your response MUST be only the JSON object, without any additional text, explanations, or markdown formatting.
 
-{{
-    "countries": {{
-        "KR": {{
+{
+    "countries": {
+        "KR": {
             "basic_rate": "percentage or amount",
-            "preferential_rates": {{}},
-            "seasonal_rates": {{}},
+            "preferential_rates": {},
+            "seasonal_rates": {},
             "notes": "special conditions"
-        }},
-        "CN": {{}},
-        "US": {{}},
-        "JP": {{}},
-        "VN": {{}},
-        "DE": {{}},
-        "TH": {{}},
-        "IN": {{}}
-    }},
-    "global_trends": {{
+        },
+        "CN": {},
+        "US": {},
+        "JP": {},
+        "VN": {},
+        "DE": {},
+        "TH": {},
+        "IN": {}
+    },
+    "global_trends": {
         "average_rate": "percentage",
         "rate_trend": "increasing/decreasing/stable",
         "affecting_factors": []
-    }},
-    "special_considerations": {{
-        "wto_bound_rates": {{}},
-        "anti_dumping": {{}},
-        "safeguard_measures": {{}}
-    }},
+    },
+    "special_considerations": {
+        "wto_bound_rates": {},
+        "anti_dumping": {},
+        "safeguard_measures": {}
+    },
     "calculation_examples": [
-        {{
+        {
             "country": "country_code",
             "product_value": 10000,
             "calculated_duty": 1500,
             "explanation": "calculation details"
-        }}
+        }
     ]
-}}
+}
 """
-
-        try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-            # AI 응답에서 JSON 추출
-            tariff_info = self._extract_json_from_response(response.content)
-
-            # JSON 추출 실패 시 폴백 데이터 사용
-            if not tariff_info or not isinstance(tariff_info, dict):
-                logger.warning(
-                    f"AI 응답에서 유효한 JSON 추출 실패, 폴백 데이터 사용: {hscode}"
-                )
-                tariff_info = self._get_fallback_tariff_info(hscode)
-
-            # 웹 검색 보강 로직은 삭제됨
-
-            return tariff_info
-
-        except Exception as e:
-            logger.error(f"Error generating tariff info: {e}")
-            return self._get_fallback_tariff_info(hscode)
-
-    async def _generate_trade_agreement_info(
-        self, hscode: str, product_description: str
-    ) -> Dict[str, Any]:
-        """무역협정 정보 생성"""
-
-        prompt = f"""Generate comprehensive trade agreement information for HSCode {hscode} ({product_description}).
-
-Focus on FTA (Free Trade Agreement) benefits and EPA (Economic Partnership Agreement) advantages.
+)
+_TRADE_AGREEMENT_SYSTEM_MESSAGE = _cached_system_message(
+    """Focus on FTA (Free Trade Agreement) benefits and EPA (Economic Partnership Agreement) advantages.
 
 Provide information in this JSON structure. Your response MUST be only the JSON object, without any additional text, explanations, or markdown formatting.
 
-{{
-    "applicable_agreements": {{
-        "KOREA_US_FTA": {{
+{
+    "applicable_agreements": {
+        "KOREA_US_FTA": {
             "preferential_rate": "percentage",
             "origin_requirements": "manufacturing requirements",
             "effective_date": "date",
             "phase_out_schedule": "immediate/5years/10years",
             "benefits": []
-        }},
-        "KOREA_EU_FTA": {{}},
-        "RCEP": {{}},
-        "CPTPP": {{}},
-        "KOREA_CHINA_FTA": {{}},
-        "KOREA_ASEAN_FTA": {{}}
-    }},
-    "origin_determination": {{
+        },
+        "KOREA_EU_FTA": {},
+        "RCEP": {},
+        "CPTPP": {},
+        "KOREA_CHINA_FTA": {},
+        "KOREA_ASEAN_FTA": {}
+    },
+    "origin_determination": {
         "general_rules": [],
         "product_specific_rules": [],
         "cumulation_possibilities": []
-    }},
-    "certification_requirements": {{
+    },
+    "certification_requirements": {
         "certificate_of_origin": "required/not_required",
         "self_certification": "allowed/not_allowed",
         "supporting_documents": []
-    }},
-    "practical_benefits": {{
+    },
+    "practical_benefits": {
         "duty_savings_potential": "high/medium/low",
         "market_access_improvements": [],
         "procedural_simplifications": []
-    }}
-}}
+    }
+}
 """
-
-        try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-            trade_info = self._extract_json_from_response(response.content)
-
-            # 웹 검색 보강 로직은 삭제됨
-
-            return trade_info
-
-        except Exception as e:
-            logger.error(f"Error generating trade agreement info: {e}")
-            return self._get_fallback_trade_agreement_info(hscode)
-
-    async def _generate_regulation_info(
-        self, hscode: str, product_description: str
-    ) -> Dict[str, Any]:
-        """규제 정보 생성"""
-
-        prompt = f"""Generate comprehensive regulatory information for HSCode {hscode} ({product_description}).
-
-Cover import/export regulations, certification requirements, and compliance issues.
+)
+_REGULATION_SYSTEM_MESSAGE = _cached_system_message(
+    """Cover import/export regulations, certification requirements, and compliance issues.
 
 Provide information in this JSON structure. Your response MUST be only the JSON object, without any additional text, explanations, or markdown formatting.
 
-{{
-    "import_regulations": {{
-        "korea": {{
+{
+    "import_regulations": {
+        "korea": {
             "licensing_required": true/false,
             "restricted_items": [],
             "certification_requirements": [
-                {{
+                {
                     "type": "KC_certification",
                     "mandatory": true/false,
                     "validity_period": "duration",
                     "issuing_authority": "authority_name"
-                }}
+                }
             ],
             "customs_procedures": [],
             "special_requirements": []
-        }},
-        "major_export_destinations": {{
-            "china": {{}},
-            "usa": {{}},
-            "japan": {{}},
-            "vietnam": {{}}
-        }}
-    }},
-    "export_regulations": {{
+        },
+        "major_export_destinations": {
+            "china": {},
+            "usa": {},
+            "japan": {},
+            "vietnam": {}
+        }
+    },
+    "export_regulations": {
         "export_licenses": [],
-        "strategic_goods_control": {{}},
+        "strategic_goods_control": {},
         "documentation_requirements": []
-    }},
-    "safety_standards": {{
+    },
+    "safety_standards": {
         "product_safety": [],
         "environmental_compliance": [],
         "labeling_requirements": []
-    }},
-    "prohibited_restricted": {{
+    },
+    "prohibited_restricted": {
         "prohibited_countries": [],
-        "restricted_quantities": {{}},
+        "restricted_quantities": {},
         "seasonal_restrictions": []
-    }},
-    "compliance_timeline": {{
+    },
+    "compliance_timeline": {
         "immediate_requirements": [],
         "upcoming_changes": [
-            {{
+            {
                 "effective_date": "date",
                 "change_description": "description",
                 "impact_level": "high/medium/low"
-            }}
+            }
         ]
-    }}
-}}
+    }
+}
 """
-
-        try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-            regulation_info = self._extract_json_from_response(response.content)
-
-            # 웹 검색 보강 로직은 삭제됨
-
-            return regulation_info
-
-        except Exception as e:
-            logger.error(f"Error generating regulation info: {e}")
-            return self._get_fallback_regulation_info(hscode)
-
-    async def _generate_non_tariff_info(
-        self, hscode: str, product_description: str
-    ) -> Dict[str, Any]:
-        """비관세 정보 생성"""
-
-        prompt = f"""Generate comprehensive non-tariff trade barriers (NTBs) information for HSCode {hscode} ({product_description}).
-
-Identify and describe various non-tariff trade barriers, including:
+)
+_NON_TARIFF_SYSTEM_MESSAGE = _cached_system_message(
+    """Identify and describe various non-tariff trade barriers, including:
 - Technical barriers (standards, regulations, conformity assessment procedures)
 - Sanitary and phytosanitary measures (SPS)
 - Customs procedures and documentation requirements
@@ -358,179 +183,682 @@ Identify and describe various non-tariff trade barriers, including:
 
 Provide information in this JSON structure. Your response MUST be only the JSON object, without any additional text, explanations, or markdown formatting.
 
-{{
-    "ntbs": {{
-        "technical_barriers": {{
+{
+    "ntbs": {
+        "technical_barriers": {
             "standards": [],
             "regulations": [],
             "conformity_assessment": []
-        }},
-        "sanitary_phytosanitary_measures": {{
+        },
+        "sanitary_phytosanitary_measures": {
             "general_requirements": [],
             "specific_requirements": []
-        }},
-        "customs_procedures": {{
+        },
+        "customs_procedures": {
             "documentation_requirements": [],
             "procedures": []
-        }},
-        "non_monetary_measures": {{
+        },
+        "non_monetary_measures": {
             "voluntary_export_restraints": [],
             "voluntary_import_restraints": []
-        }},
-        "trade_remedies": {{
-            "anti_dumping": {{}},
-            "countervailing": {{}},
-            "safeguard": {{}}
-        }},
-        "trade_restrictions": {{
+        },
+        "trade_remedies": {
+            "anti_dumping": {},
+            "countervailing": {},
+            "safeguard": {}
+        },
+        "trade_restrictions": {
             "embargoes": [],
             "prohibitions": [],
             "quantitative_restrictions": []
-        }},
+        },
         "trade_sanctions": []
-    }},
-    "practical_impact": {{
+    },
+    "practical_impact": {
         "duty_savings_potential": "high/medium/low",
         "market_access_challenges": [],
         "procedural_simplifications": []
-    }}
-}}
+    }
+}
 """
-
-        try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-            non_tariff_info = self._extract_json_from_response(response.content)
-
-            # 웹 검색 보강 로직은 삭제됨
-
-            return non_tariff_info
-
-        except Exception as e:
-            logger.error(f"Error generating non-tariff info: {e}")
-            return self._get_fallback_non_tariff_info(hscode)
-
-    async def _generate_similar_hscodes(
-        self, hscode: str, product_description: str
-    ) -> Dict[str, Any]:
-        """유사 HSCode 정보 생성"""
-
-        prompt = f"""Find and analyze similar HSCodes to {hscode} ({product_description}).
-
-Identify related codes that users might be interested in or that could be alternative classifications.
+)
+_SIMILAR_HSCODES_SYSTEM_MESSAGE = _cached_system_message(
+    """Identify related codes that users might be interested in or that could be alternative classifications.
 
 Provide information in this JSON structure. Your response MUST be only the JSON object, without any additional text, explanations, or markdown formatting.
 
-{{
+{
     "direct_related": [
-        {{
+        {
             "hscode": "similar_code",
             "description": "description",
             "similarity_score": 0.95,
             "relationship_type": "parent/child/sibling/alternative",
             "key_differences": [],
             "use_cases": []
-        }}
+        }
     ],
     "category_related": [
-        {{
+        {
             "hscode": "category_code",
             "description": "description", 
             "similarity_score": 0.80,
             "category": "같은 카테고리",
             "why_related": "관련성 설명"
-        }}
+        }
     ],
     "functional_alternatives": [
-        {{
+        {
             "hscode": "alternative_code",
             "description": "description",
             "similarity_score": 0.75,
             "functional_similarity": "기능적 유사성",
             "market_positioning": "시장에서의 위치"
-        }}
+        }
     ],
-    "classification_tips": {{
+    "classification_tips": {
         "common_mistakes": [],
         "decision_tree": [],
         "expert_guidance": []
-    }}
-}}
+    }
+}
 """
-
-        try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-            similar_info = self._extract_json_from_response(response.content)
-            return similar_info
-
-        except Exception as e:
-            logger.error(f"Error generating similar HSCodes: {e}")
-            return self._get_fallback_similar_hscodes(hscode)
-
-    async def _generate_market_analysis(
-        self, hscode: str, product_description: str
-    ) -> Dict[str, Any]:
-        """시장 분석 정보 생성"""
-
-        prompt = f"""Generate comprehensive market analysis for HSCode {hscode} ({product_description}).
-
-Provide trade statistics, trends, and market insights.
+)
+_MARKET_ANALYSIS_SYSTEM_MESSAGE = _cached_system_message(
+    """Provide trade statistics, trends, and market insights.
 
 Structure the information as follows. Your response MUST be only the JSON object, without any additional text, explanations, or markdown formatting.
 
-{{
-    "trade_statistics": {{
-        "korea_exports": {{
+{
+    "trade_statistics": {
+        "korea_exports": {
             "total_value_usd": 0,
             "growth_rate_yoy": 0.0,
             "top_destinations": [
-                {{
+                {
                     "country": "country_name",
                     "value_usd": 0,
                     "market_share": 0.0,
                     "growth_trend": "increasing/stable/decreasing"
-                }}
+                }
             ]
-        }},
-        "korea_imports": {{
+        },
+        "korea_imports": {
             "total_value_usd": 0,
             "growth_rate_yoy": 0.0,
             "top_origins": []
-        }},
-        "global_trade": {{
+        },
+        "global_trade": {
             "total_market_size_usd": 0,
             "major_players": [],
             "market_concentration": "high/medium/low"
-        }}
-    }},
-    "market_trends": {{
+        }
+    },
+    "market_trends": {
         "demand_drivers": [],
         "supply_factors": [],
-        "price_trends": {{
+        "price_trends": {
             "direction": "increasing/decreasing/stable",
             "factors": [],
             "forecast": "short_term_outlook"
-        }},
+        },
         "technological_developments": [],
         "regulatory_changes_impact": []
-    }},
-    "competitive_landscape": {{
+    },
+    "competitive_landscape": {
         "key_players": [],
         "market_entry_barriers": [],
         "opportunities": [],
         "threats": []
-    }},
-    "future_outlook": {{
-        "growth_projections": {{}},
+    },
+    "future_outlook": {
+        "growth_projections": {},
         "emerging_markets": [],
         "disruptive_factors": [],
         "strategic_recommendations": []
-    }}
-}}
+    }
+}
 """
+)
+
+# 상세 정보 항목 (결과 키, 생성 메서드 이름) - 품질 지표도 이 순서로 계산
+DETAIL_SECTIONS = (
+    ("tariff_info", "_generate_tariff_info"),
+    ("trade_agreement_info", "_generate_trade_agreement_info"),
+    ("regulation_info", "_generate_regulation_info"),
+    ("non_tariff_info", "_generate_non_tariff_info"),
+    ("similar_hscodes_detailed", "_generate_similar_hscodes"),
+    ("market_analysis", "_generate_market_analysis"),
+)
+# 항목별 LLM 호출 제한 시간 (초) - 한 항목이 지연되어도 나머지 결과는 반환
+SECTION_TIMEOUT_SECONDS = 180.0
+# 동시 요청 제한으로 호출 슬롯을 기다리는 최대 시간 (초)
+LLM_SLOT_WAIT_SECONDS = 60.0
+
+# 항목별 최대 출력 토큰 (thinking 포함) - 응답 크기에 맞춰 과도한 할당을 피함
+SECTION_MAX_TOKENS = {
+    "tariff_info": 4_000,
+    "trade_agreement_info": 5_000,
+    "regulation_info": 8_000,
+    "non_tariff_info": 5_000,
+    "similar_hscodes_detailed": 3_000,
+    "market_analysis": 8_000,
+}
+# thinking 예산 상한 (항목별 예산은 응답용으로 최소 1024 토큰을 남김)
+THINKING_BUDGET_TOKENS = 6_000
+THINKING_RESPONSE_RESERVE_TOKENS = 1_024
+# 고정 스키마를 채우는 것이 대부분이라 thinking 없이 생성하는 항목
+NO_THINKING_SECTIONS = frozenset({"tariff_info", "similar_hscodes_detailed"})
+
+
+class TariffInfo(BaseModel):
+    """관세율 정보 응답 스키마"""
+
+    countries: Dict[str, Dict[str, Any]] = Field(
+        ...,
+        description="국가 코드별 관세율 (basic_rate, preferential_rates, seasonal_rates, notes)",
+    )
+    global_trends: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="average_rate, rate_trend, affecting_factors",
+    )
+    special_considerations: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="wto_bound_rates, anti_dumping, safeguard_measures",
+    )
+    calculation_examples: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="country, product_value, calculated_duty, explanation",
+    )
+
+
+class SimilarHSCodesInfo(BaseModel):
+    """유사 HSCode 정보 응답 스키마"""
+
+    direct_related: List[Dict[str, Any]] = Field(
+        default_factory=list, description="직접 관련된 HSCode 목록"
+    )
+    category_related: List[Dict[str, Any]] = Field(
+        default_factory=list, description="같은 카테고리의 HSCode 목록"
+    )
+    functional_alternatives: List[Dict[str, Any]] = Field(
+        default_factory=list, description="기능적으로 대체 가능한 HSCode 목록"
+    )
+    classification_tips: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="common_mistakes, decision_tree, expert_guidance",
+    )
+
+
+# 도구 호출로 응답 스키마를 강제하는 항목 (강제 도구 호출은 thinking과 함께 쓸 수 없음)
+STRUCTURED_SECTIONS = {
+    "tariff_info": TariffInfo,
+    "similar_hscodes_detailed": SimilarHSCodesInfo,
+}
+# 스키마 검증 실패 시 오류 내용을 전달하여 다시 요청하는 최대 횟수
+STRUCTURED_REPAIR_RETRIES = 2
+
+# 프롬프트나 응답 스키마를 변경하면 올려서 이전 캐시 결과를 무효화
+PROMPT_VERSION = 1
+# 항목별 생성 결과 캐시 (키 -> 저장 시각, 결과) - 같은 HSCode/제품 재요청 시 LLM 호출 생략
+SECTION_CACHE_TTL = 86400
+SECTION_CACHE_MAX_SIZE = 2048
+_SECTION_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _section_cache_key(section: str, hscode: str, product_description: str) -> str:
+    """프롬프트 버전, 모델, 항목, 입력값으로 캐시 키 생성"""
+    source = (
+        f"{PROMPT_VERSION}|{settings.ANTHROPIC_MODEL}|{section}|"
+        f"{hscode}|{product_description}"
+    )
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _get_cached_section(key: str) -> Optional[Dict[str, Any]]:
+    cache_entry = _SECTION_CACHE.get(key)
+    if cache_entry and time.time() - cache_entry[0] < SECTION_CACHE_TTL:
+        # 호출 측이 결과를 수정해도 캐시된 항목이 바뀌지 않도록 복사본 반환
+        return copy.deepcopy(cache_entry[1])
+    return None
+
+
+def _cache_section(key: str, result: Dict[str, Any]) -> None:
+    _SECTION_CACHE[key] = (time.time(), copy.deepcopy(result))
+    if len(_SECTION_CACHE) > SECTION_CACHE_MAX_SIZE:
+        oldest = sorted(_SECTION_CACHE, key=lambda k: _SECTION_CACHE[k][0])
+        for k in oldest[: SECTION_CACHE_MAX_SIZE // 2]:
+            del _SECTION_CACHE[k]
+
+
+# 주요 수출입 대상국 (국가 코드 -> 국가명)
+MAJOR_COUNTRIES = {
+    "KR": "한국",
+    "CN": "중국",
+    "US": "미국",
+    "JP": "일본",
+    "VN": "베트남",
+    "DE": "독일",
+    "TH": "태국",
+    "IN": "인도",
+}
+
+# 진행 중인 종합 상세 정보 생성 작업 ((HSCode, 제품 설명) -> 작업)
+_INFLIGHT_GENERATIONS: Dict[Tuple[str, str], asyncio.Future] = {}
+# 진행 중인 항목별 생성 작업 (항목 캐시 키 -> 작업)
+# 종합 생성과 항목 스트리밍이 같은 항목의 LLM 호출을 함께 기다림
+_INFLIGHT_SECTIONS: Dict[str, asyncio.Future] = {}
+
+# 모든 인스턴스가 공유하는 Claude API 동시 요청 제한 (레이트 리밋 초과로 인한 재시도 방지)
+_LLM_SEMAPHORE = asyncio.Semaphore(settings.anthropic_concurrency_limit)
+
+
+class EnhancedDetailGenerator:
+    """상세페이지 정보 생성 서비스 - AI 기반 종합 분석"""
+
+    def __init__(self):
+        # 항목별 모델이 공유하는 ChatAnthropic 클라이언트 설정
+        # (thinking은 인스턴스 값이 bind 인자를 덮어쓰므로 항목별 모델에서만 지정)
+        self._llm_config = {
+            "model_name": settings.ANTHROPIC_MODEL,
+            "api_key": SecretStr(settings.ANTHROPIC_API_KEY),
+            "temperature": 1,
+            "timeout": 1200.0,
+            "max_retries": 5,
+            "streaming": True,
+            "stop": None,
+            "default_headers": {"anthropic-beta": "extended-cache-ttl-2025-04-11"},
+        }
+        # 항목별로 max_tokens를 제한하고 thinking 예산을 그보다 작게 맞춘 모델
+        self._section_llms = {
+            key: self._build_section_llm(key, max_tokens)
+            for key, max_tokens in SECTION_MAX_TOKENS.items()
+        }
+        # self.web_search_service = WebSearchService() # 이 줄을 삭제합니다.
+
+        # 주요 수출입 대상국
+        self.major_countries = MAJOR_COUNTRIES
+
+    async def generate_comprehensive_detail_info(
+        self, hscode: str, product_description: str, user_context: str, db_session=None
+    ) -> Dict[str, Any]:
+        """
+        HSCode에 대한 종합적인 상세 정보 생성
+
+        Args:
+            hscode: HSCode (예: "8517.12.00")
+            product_description: 제품 설명
+            user_context: 사용자 질문 맥락
+            db_session: 데이터베이스 세션 (웹 검색 캐싱용)
+
+        Returns:
+            상세 정보가 담긴 딕셔너리
+        """
+        # 같은 HSCode/제품에 대해 진행 중인 생성이 있으면 결과를 공유
+        inflight_key = (hscode, product_description)
+        task = _INFLIGHT_GENERATIONS.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._generate_comprehensive_detail_info(hscode, product_description)
+            )
+            _INFLIGHT_GENERATIONS[inflight_key] = task
+
+            def _drop_inflight(t: asyncio.Future) -> None:
+                if _INFLIGHT_GENERATIONS.get(inflight_key) is t:
+                    del _INFLIGHT_GENERATIONS[inflight_key]
+
+            task.add_done_callback(_drop_inflight)
+        else:
+            logger.info(f"진행 중인 상세 정보 생성 결과 공유: {hscode}")
+
+        return await asyncio.shield(task)
+
+    async def _generate_comprehensive_detail_info(
+        self, hscode: str, product_description: str
+    ) -> Dict[str, Any]:
+        """항목별 병렬 생성 결과를 상세 정보로 조합"""
+        start_time = time.perf_counter()
+        logger.info(f"Starting comprehensive detail generation for HSCode: {hscode}")
+
+        try:
+            # 항목별로 병렬 생성하고 완료되는 순서대로 수집
+            section_results: Dict[str, Any] = {}
+            async for key, result in self.iter_detail_sections(
+                hscode, product_description
+            ):
+                section_results[key] = result
+            results = [section_results[key] for key, _ in DETAIL_SECTIONS]
+            quality_score, quality_indicators = self._summarize_results(results)
+
+            # 결과 조합
+            detail_info = {
+                **{
+                    key: result if not isinstance(result, Exception) else {}
+                    for (key, _), result in zip(DETAIL_SECTIONS, results)
+                },
+                "verification_status": "ai_generated",
+                "data_quality_score": quality_score,
+                "needs_update": False,
+                "last_verified_at": datetime.now(timezone.utc).isoformat(),
+                "expert_opinion": None,
+                "generation_metadata": {
+                    "generation_time_ms": int(
+                        (time.perf_counter() - start_time) * 1000
+                    ),
+                    "ai_model": "claude-3-5-sonnet-20241022",
+                    "generation_method": "comprehensive_parallel",
+                    "data_sources": ["ai_analysis", "web_search"],
+                    "quality_indicators": quality_indicators,
+                },
+            }
+
+            logger.info(
+                f"Detail generation completed in {detail_info['generation_metadata']['generation_time_ms']}ms"
+            )
+            return detail_info
+
+        except Exception as e:
+            logger.error(
+                f"Error generating comprehensive detail info: {e}", exc_info=True
+            )
+            return self._get_fallback_detail_info(hscode, product_description)
+
+    def _build_section_llm(self, key: str, max_tokens: int):
+        """항목별 설정(max_tokens, thinking, 응답 스키마)을 적용한 모델 생성"""
+        from langchain_anthropic import ChatAnthropic
+
+        # thinking을 지정하지 않은 모델은 요청에 thinking 필드를 넣지 않음
+        thinking = None
+        if key not in NO_THINKING_SECTIONS:
+            budget_tokens = min(
+                max_tokens - THINKING_RESPONSE_RESERVE_TOKENS, THINKING_BUDGET_TOKENS
+            )
+            # budget_tokens가 max_tokens 이상이면 API가 400을 반환함
+            assert max_tokens > budget_tokens, (key, max_tokens, budget_tokens)
+            thinking = {"type": "enabled", "budget_tokens": budget_tokens}
+
+        llm = ChatAnthropic(
+            **self._llm_config, max_tokens_to_sample=max_tokens, thinking=thinking
+        )
+        schema = STRUCTURED_SECTIONS.get(key)
+        if schema is not None:
+            # 도구 강제 호출은 thinking과 함께 쓸 수 없으므로 thinking이 켜진 모델은
+            # 도구 사용을 모델에 맡기고, 도구를 쓰지 않으면 텍스트 JSON으로 처리함
+            tool_choice = schema.__name__ if thinking is None else "auto"
+            return llm.bind_tools([schema], tool_choice=tool_choice)
+        return llm
+
+    async def iter_detail_sections(
+        self, hscode: str, product_description: str
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        상세 정보 항목을 병렬로 생성하여 완료되는 순서대로 (키, 결과)를 반환.
+        실패한 항목은 결과 대신 예외 객체를 반환함.
+        """
+        tasks = [
+            asyncio.ensure_future(
+                self._generate_section(
+                    key, getattr(self, method_name), hscode, product_description
+                )
+            )
+            for key, method_name in DETAIL_SECTIONS
+        ]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            # 호출 측이 중간에 순회를 멈추면 남은 생성 작업 취소
+            for task in tasks:
+                task.cancel()
+
+    async def _generate_section(
+        self, key: str, generate, hscode: str, product_description: str
+    ) -> Tuple[str, Any]:
+        """단일 항목 생성 (예외는 결과로 반환)"""
+        try:
+            return key, await generate(hscode, product_description)
+        except Exception as e:
+            return key, e
+
+    async def _ainvoke(self, section: str, messages: List[Any]) -> Any:
+        """
+        동시 요청 수 제한을 적용하여 LLM 호출.
+        슬롯 대기와 실제 호출에 각각 제한 시간을 두어 항목당 소요 시간의 상한을 보장함.
+        """
+        try:
+            await asyncio.wait_for(_LLM_SEMAPHORE.acquire(), LLM_SLOT_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(f"LLM 호출 슬롯 대기 시간 초과 ({LLM_SLOT_WAIT_SECONDS}s)")
+            raise
+
+        try:
+            return await asyncio.wait_for(
+                self._section_llms[section].ainvoke(messages),
+                SECTION_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"LLM 호출 시간 초과 ({SECTION_TIMEOUT_SECONDS}s)")
+            raise
+        finally:
+            _LLM_SEMAPHORE.release()
+
+    async def _ainvoke_structured(
+        self, section: str, messages: List[Any]
+    ) -> Dict[str, Any]:
+        """스키마를 강제한 LLM 호출 (검증 실패 시 오류를 도구 결과로 전달하여 재요청)"""
+        schema = STRUCTURED_SECTIONS[section]
+        for attempt in range(STRUCTURED_REPAIR_RETRIES + 1):
+            response = await self._ainvoke(section, messages)
+            try:
+                return self._parse_structured_response(response, schema)
+            except ValidationError as e:
+                if attempt == STRUCTURED_REPAIR_RETRIES:
+                    raise
+                logger.warning(
+                    f"{section} 스키마 검증 실패, 재요청 "
+                    f"({attempt + 1}/{STRUCTURED_REPAIR_RETRIES}): {e}"
+                )
+                messages = [
+                    *messages,
+                    response,
+                    ToolMessage(
+                        content=(
+                            f"Your previous response failed validation: {e}. "
+                            f"Call {schema.__name__} again with corrected arguments."
+                        ),
+                        tool_call_id=response.tool_calls[0]["id"],
+                    ),
+                ]
+
+    async def _invoke_section(
+        self,
+        section: str,
+        hscode: str,
+        product_description: str,
+        messages: List[Any],
+    ) -> Dict[str, Any]:
+        """
+        항목 생성 호출 및 응답 파싱.
+        같은 HSCode/제품의 성공한 결과는 캐시에서 반환하고, 진행 중인 호출은 공유함.
+        """
+        cache_key = _section_cache_key(section, hscode, product_description)
+        cached = _get_cached_section(cache_key)
+        if cached is not None:
+            logger.debug(f"{section} 캐시 적중: {hscode}")
+            return cached
+
+        task = _INFLIGHT_SECTIONS.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._call_section(section, cache_key, messages)
+            )
+            _INFLIGHT_SECTIONS[cache_key] = task
+
+            def _drop_inflight(t: asyncio.Future) -> None:
+                if _INFLIGHT_SECTIONS.get(cache_key) is t:
+                    del _INFLIGHT_SECTIONS[cache_key]
+                # 기다리던 쪽이 모두 취소된 경우에도 예외가 회수되지 않은 채 남지 않도록 함
+                if not t.cancelled():
+                    t.exception()
+
+            task.add_done_callback(_drop_inflight)
+        else:
+            logger.debug(f"진행 중인 {section} 생성 결과 공유: {hscode}")
+
+        # 스트리밍 연결이 끊겨도 다른 요청이 기다리는 호출은 취소하지 않음
+        # (함께 기다린 요청끼리 같은 dict를 공유하지 않도록 복사본 반환)
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _call_section(
+        self, section: str, cache_key: str, messages: List[Any]
+    ) -> Dict[str, Any]:
+        """항목 LLM 호출 후 성공한 결과를 캐시에 저장"""
+        if section in STRUCTURED_SECTIONS:
+            result = await self._ainvoke_structured(section, messages)
+        else:
+            response = await self._ainvoke(section, messages)
+            result = self._extract_json_from_response(response.content)
+
+        # 파싱에 실패한 응답은 캐시하지 않음
+        if result and isinstance(result, dict) and "error" not in result:
+            _cache_section(cache_key, result)
+        return result
+
+    async def _generate_tariff_info(
+        self, hscode: str, product_description: str
+    ) -> Dict[str, Any]:
+        """관세율 정보 생성"""
+
+        prompt = f"You are a trade expert specializing in tariff analysis. Generate comprehensive tariff information for HSCode {hscode} ({product_description})."
+
+        try:
+            tariff_info = await self._invoke_section(
+                "tariff_info",
+                hscode,
+                product_description,
+                [_TARIFF_SYSTEM_MESSAGE, HumanMessage(content=prompt)],
+            )
+
+            # JSON 추출 실패 시 폴백 데이터 사용
+            if not tariff_info or not isinstance(tariff_info, dict):
+                logger.warning(
+                    f"AI 응답에서 유효한 JSON 추출 실패, 폴백 데이터 사용: {hscode}"
+                )
+                tariff_info = self._get_fallback_tariff_info(hscode)
+
+            # 웹 검색 보강 로직은 삭제됨
+
+            return tariff_info
+
+        except Exception as e:
+            logger.error(f"Error generating tariff info: {e}")
+            return self._get_fallback_tariff_info(hscode)
+
+    async def _generate_trade_agreement_info(
+        self, hscode: str, product_description: str
+    ) -> Dict[str, Any]:
+        """무역협정 정보 생성"""
+
+        prompt = f"Generate comprehensive trade agreement information for HSCode {hscode} ({product_description})."
+
+        try:
+            trade_info = await self._invoke_section(
+                "trade_agreement_info",
+                hscode,
+                product_description,
+                [_TRADE_AGREEMENT_SYSTEM_MESSAGE, HumanMessage(content=prompt)],
+            )
+
+            # 웹 검색 보강 로직은 삭제됨
+
+            return trade_info
+
+        except Exception as e:
+            logger.error(f"Error generating trade agreement info: {e}")
+            return self._get_fallback_trade_agreement_info(hscode)
+
+    async def _generate_regulation_info(
+        self, hscode: str, product_description: str
+    ) -> Dict[str, Any]:
+        """규제 정보 생성"""
+
+        prompt = f"Generate comprehensive regulatory information for HSCode {hscode} ({product_description})."
+
+        try:
+            regulation_info = await self._invoke_section(
+                "regulation_info",
+                hscode,
+                product_description,
+                [_REGULATION_SYSTEM_MESSAGE, HumanMessage(content=prompt)],
+            )
+
+            # 웹 검색 보강 로직은 삭제됨
+
+            return regulation_info
+
+        except Exception as e:
+            logger.error(f"Error generating regulation info: {e}")
+            return self._get_fallback_regulation_info(hscode)
+
+    async def _generate_non_tariff_info(
+        self, hscode: str, product_description: str
+    ) -> Dict[str, Any]:
+        """비관세 정보 생성"""
+
+        prompt = f"Generate comprehensive non-tariff trade barriers (NTBs) information for HSCode {hscode} ({product_description})."
+
+        try:
+            non_tariff_info = await self._invoke_section(
+                "non_tariff_info",
+                hscode,
+                product_description,
+                [_NON_TARIFF_SYSTEM_MESSAGE, HumanMessage(content=prompt)],
+            )
+
+            # 웹 검색 보강 로직은 삭제됨
+
+            return non_tariff_info
+
+        except Exception as e:
+            logger.error(f"Error generating non-tariff info: {e}")
+            return self._get_fallback_non_tariff_info(hscode)
+
+    async def _generate_similar_hscodes(
+        self, hscode: str, product_description: str
+    ) -> Dict[str, Any]:
+        """유사 HSCode 정보 생성"""
+
+        prompt = (
+            f"Find and analyze similar HSCodes to {hscode} ({product_description})."
+        )
+
+        try:
+            similar_info = await self._invoke_section(
+                "similar_hscodes_detailed",
+                hscode,
+                product_description,
+                [_SIMILAR_HSCODES_SYSTEM_MESSAGE, HumanMessage(content=prompt)],
+            )
+            return similar_info
+
+        except Exception as e:
+            logger.error(f"Error generating similar HSCodes: {e}")
+            return self._get_fallback_similar_hscodes(hscode)
+
+    async def _generate_market_analysis(
+        self, hscode: str, product_description: str
+    ) -> Dict[str, Any]:
+        """시장 분석 정보 생성"""
+
+        prompt = f"Generate comprehensive market analysis for HSCode {hscode} ({product_description})."
 
         try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-            market_info = self._extract_json_from_response(response.content)
+            market_info = await self._invoke_section(
+                "market_analysis",
+                hscode,
+                product_description,
+                [_MARKET_ANALYSIS_SYSTEM_MESSAGE, HumanMessage(content=prompt)],
+            )
 
             # 웹 검색 보강 로직은 삭제됨
 
@@ -547,6 +875,15 @@ Structure the information as follows. Your response MUST be only the JSON object
     # async def _search_market_web_info...
     # async def _search_non_tariff_web_info...
 
+    def _parse_structured_response(
+        self, response, schema: Type[BaseModel]
+    ) -> Dict[str, Any]:
+        """도구 호출 응답의 인자를 스키마로 검증하여 dict로 변환"""
+        if not response.tool_calls:
+            # 도구 호출이 없으면 텍스트 응답에서 JSON 추출
+            return self._extract_json_from_response(response.content)
+        return schema.model_validate(response.tool_calls[0]["args"]).model_dump()
+
     def _extract_json_from_response(self, response_content) -> Dict[str, Any]:
         """AI 응답에서 JSON 추출 - 다양한 응답 타입 처리"""
         text = ""
@@ -570,31 +907,26 @@ Structure the information as follows. Your response MUST be only the JSON object
                 # 기타 타입인 경우 문자열로 변환 시도
                 text = str(response_content)
 
-            text = text.strip()
-
-            # JSON 블록 찾기 (마크다운 코드 블록 제거)
-            if text.startswith("```json"):
-                text = text[len("```json") :].strip()
-            if text.startswith("```"):
-                text = text[len("```") :].strip()
-            if text.endswith("```"):
-                text = text[: -len("```")].strip()
-
-            # 응답 시작에 있는 불필요한 텍스트 제거 (예: "Here is the JSON...")
+            # 첫 "{"부터 마지막 "}"까지만 사용하므로 마크다운 코드 블록과
+            # 앞뒤 설명 문구 (예: "Here is the JSON...")는 별도 복사 없이 제외됨
             start_pos = text.find("{")
             if start_pos == -1:
-                raise json.JSONDecodeError("No JSON object found in response", text, 0)
+                raise orjson.JSONDecodeError(
+                    "No JSON object found in response", text, 0
+                )
 
             # 응답 끝에 있는 불필요한 텍스트 제거
             end_pos = text.rfind("}")
             if end_pos == -1:
-                raise json.JSONDecodeError("No JSON object found in response", text, 0)
+                raise orjson.JSONDecodeError(
+                    "No JSON object found in response", text, 0
+                )
 
             json_text = text[start_pos : end_pos + 1]
 
-            return json.loads(json_text)
+            return orjson.loads(json_text)
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.warning(
                 f"Failed to decode JSON from response. Error: {e}. Raw text: '{text[:500]}...'"
             )
@@ -613,61 +945,47 @@ Structure the information as follows. Your response MUST be only the JSON object
                 "raw_response": text[:500],
             }
 
-    def _calculate_quality_score(self, results: List[Any]) -> float:
-        """생성된 정보의 품질 점수 계산"""
-        if not results:
-            return 0.0
-
+    def _summarize_results(self, results: List[Any]) -> Tuple[float, Dict[str, Any]]:
+        """생성 결과를 한 번 순회하여 품질 점수와 품질 지표를 함께 계산"""
         successful_results = 0
-        for r in results:
-            if isinstance(r, dict) and "error" not in r:
-                successful_results += 1
-
-        total_results = len(results)
-
-        if total_results == 0:
-            return 0.0
-
-        base_score = successful_results / total_results
-
-        # 각 결과의 내용 품질 평가
         content_quality = 0.0
+        error_details = []
         for result in results:
-            if isinstance(result, dict) and "error" not in result:
-                # 키의 개수와 값의 존재 여부로 품질 평가
-                if len(result) > 2 and any(result.values()):
-                    content_quality += 0.2
-                else:
-                    content_quality += 0.05
-
-        # 최종 점수는 1점을 넘지 않도록 하고, 성공한 결과가 하나도 없다면 0.1 이하로 유지
-        final_score = base_score
-        if successful_results > 0:
-            final_score += content_quality / successful_results
-
-        if successful_results == 0:
-            return 0.1  # 모든 정보 생성 실패 시 매우 낮은 점수
-
-        return min(final_score, 1.0)
+            if not isinstance(result, dict):
+                continue
+            if "error" in result:
+                error_details.append(result)
+                continue
+            successful_results += 1
+            # 키의 개수와 값의 존재 여부로 품질 평가
+            if len(result) > 2 and any(result.values()):
+                content_quality += 0.2
+            else:
+                content_quality += 0.05
 
-    def _get_quality_indicators(self, results: List[Any]) -> Dict[str, Any]:
-        """품질 지표 생성"""
-        successful_generations = sum(
-            1 for r in results if isinstance(r, dict) and "error" not in r
-        )
-        return {
-            "successful_generations": successful_generations,
-            "total_attempts": len(results),
-            "error_details": [
-                r for r in results if isinstance(r, dict) and "error" in r
-            ],
+        total_results = len(results)
+        indicators = {
+            "successful_generations": successful_results,
+            "total_attempts": total_results,
+            "error_details": error_details,
             "data_completeness": (
                 "high"
-                if successful_generations == len(results)
-                else ("partial" if successful_generations > 0 else "failed")
+                if successful_results == total_results
+                else ("partial" if successful_results > 0 else "failed")
             ),
         }
 
+        if total_results == 0:
+            return 0.0, indicators
+        if successful_results == 0:
+            return 0.1, indicators  # 모든 정보 생성 실패 시 매우 낮은 점수
+
+        # 최종 점수는 1점을 넘지 않도록 함
+        final_score = (
+            successful_results / total_results + content_quality / successful_results
+        )
+        return min(final_score, 1.0), indicators
+
     def _get_fallback_detail_info(
         self, hscode: str, product_description: str
     ) -> Dict[str, Any]:
@@ -682,7 +1000,7 @@ Structure the information as follows. Your response MUST be only the JSON object
             "verification_status": "fallback_generated",
             "data_quality_score": 0.3,
             "needs_update": True,
-            "last_verified_at": datetime.utcnow().isoformat(),
+            "last_verified_at": datetime.now(timezone.utc).isoformat(),
             "expert_opinion": "Fallback data - requires expert verification",
             "generation_metadata": {
                 "generation_method": "fallback",
@@ -778,3 +1096,12 @@ Structure the information as follows. Your response MUST be only the JSON object
             },
             "recommendation": f"Please gather current market data for HSCode {hscode}",
         }
+
+
+@functools.lru_cache(maxsize=1)
+def get_detail_generator() -> EnhancedDetailGenerator:
+    """
+    EnhancedDetailGenerator 공유 인스턴스.
+    서비스마다 ChatAnthropic 클라이언트를 새로 만들지 않고 커넥션 풀을 재사용함.
+    """
+    return EnhancedDetailGenerator()
@@ -1,14 +1,16 @@
+import copy
 import logging
 import json
 import re
 import asyncio
-from typing import Dict, Any, List, Optional, Union
+import time
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
 from enum import Enum
 
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from pydantic import BaseModel, Field, SecretStr
+from pydantic import BaseModel, Field, SecretStr, ValidationError
 
 from app.core.config import settings
 from app.utils.llm_response_parser import extract_text_from_anthropic_response
@@ -19,6 +21,141 @@ from app.models.chat_models import ChatRequest
 logger = logging.getLogger(__name__)
 
 
+def _keyword_re(keywords: tuple) -> re.Pattern:
+    """키워드 목록을 하나의 alternation 정규식으로 컴파일 (한 번의 스캔으로 확인)"""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+# 정보 충분성 분석용 키워드 패턴 (소문자 메시지 기준)
+_ELECTRONICS_RE = _keyword_re(
+    (
+        "스마트폰",
+        "smartphone",
+        "핸드폰",
+        "휴대폰",
+        "갤럭시",
+        "iphone",
+        "아이폰",
+        "노트북",
+        "laptop",
+        "컴퓨터",
+        "computer",
+        "태블릿",
+        "tablet",
+    )
+)
+_MACHINERY_RE = _keyword_re(("기계", "machine", "장비", "equipment", "모터", "motor"))
+_CHEMICAL_RE = _keyword_re(("화학", "chemical", "약품", "물질", "substance"))
+# 명시적인 HSCode 분류 요청 키워드
+_EXPLICIT_REQUEST_RE = _keyword_re(
+    (
+        "hscode",
+        "hs code",
+        "관세율표",
+        "품목분류",
+        "세번",
+        "분류해줘",
+        "분류해주세요",
+        "분류 요청",
+        "분류 부탁",
+        "tariff",
+        "classification",
+        "customs",
+        "통관코드",
+        "수출입코드",
+        "관세코드",
+        "품목번호",
+        "상품분류",
+        "무역분류",
+        "분류해",
+        "분류를",
+        "코드 알려",
+        "코드를 알려",
+        "어떤 코드",
+    )
+)
+_QUESTION_RE = _keyword_re(
+    ("?", "？", "뭐야", "무엇", "what", "알려줘", "알려주세요", "어떻게", "how")
+)
+_DETAILED_INFO_RE = _keyword_re(
+    (
+        "모델",
+        "model",
+        "제조사",
+        "manufacturer",
+        "기능",
+        "function",
+        "사양",
+        "specification",
+        "재료",
+        "material",
+        "용도",
+        "purpose",
+        "크기",
+        "size",
+        "무게",
+        "weight",
+    )
+)
+
+# HSCode 분류 의도 감지용 키워드 (일치한 키워드 수로 신뢰도를 계산하므로 목록 유지)
+_HSCODE_INTENT_KEYWORDS = (
+    "hscode",
+    "hs code",
+    "관세율표",
+    "품목분류",
+    "세번",
+    "tariff",
+    "classification",
+    "customs",
+    "통관",
+    "수출입",
+    "관세",
+    "품목번호",
+    "상품분류",
+    "무역분류",
+)
+_PRODUCT_INDICATOR_RE = _keyword_re(("제품", "상품", "물품", "기기", "장치", "부품"))
+_CLASSIFICATION_INDICATOR_RE = _keyword_re(("분류", "코드", "번호", "확인"))
+
+# 카테고리별 필수 정보 템플릿 선택용 패턴 (카테고리명 기준)
+_ELECTRONICS_CATEGORY_RE = _keyword_re(
+    ("전자", "electronic", "smart", "phone", "computer", "device")
+)
+_MACHINERY_CATEGORY_RE = _keyword_re(("기계", "machine", "equipment", "tool", "motor"))
+_CHEMICAL_CATEGORY_RE = _keyword_re(("화학", "chemical", "substance", "material"))
+
+# 분류 응답 캐시 ((단계, 제품 카테고리, 정규화된 질의) -> (저장 시각, 응답))
+# 같은 제품 질의가 반복될 때 웹 검색/LLM 호출을 생략
+RESPONSE_CACHE_TTL = 86400
+RESPONSE_CACHE_MAX_SIZE = 1024
+_RESPONSE_CACHE: Dict[Tuple[str, str, str], Tuple[float, Any]] = {}
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _response_cache_key(
+    stage: str, product_category: str, message: str
+) -> Tuple[str, str, str]:
+    """대소문자와 공백 차이를 무시하도록 질의를 정규화하여 캐시 키 생성"""
+    normalized = _WHITESPACE_RE.sub(" ", message).strip().lower()
+    return stage, product_category, normalized
+
+
+def _get_cached_response(key: Tuple[str, str, str]) -> Optional[Any]:
+    cache_entry = _RESPONSE_CACHE.get(key)
+    if cache_entry and time.time() - cache_entry[0] < RESPONSE_CACHE_TTL:
+        return cache_entry[1]
+    return None
+
+
+def _cache_response(key: Tuple[str, str, str], response: Any) -> None:
+    _RESPONSE_CACHE[key] = (time.time(), response)
+    if len(_RESPONSE_CACHE) > RESPONSE_CACHE_MAX_SIZE:
+        oldest = sorted(_RESPONSE_CACHE, key=lambda k: _RESPONSE_CACHE[k][0])
+        for k in oldest[: RESPONSE_CACHE_MAX_SIZE // 2]:
+            del _RESPONSE_CACHE[k]
+
+
 class HSCodeClassificationStage(str, Enum):
     """HSCode 분류 단계 열거형"""
 
@@ -203,27 +340,11 @@ class HSCodeRequiredInfoTemplate:
         """카테고리별 요구사항 반환"""
         category_lower = category.lower()
 
-        if any(
-            keyword in category_lower
-            for keyword in [
-                "전자",
-                "electronic",
-                "smart",
-                "phone",
-                "computer",
-                "device",
-            ]
-        ):
+        if _ELECTRONICS_CATEGORY_RE.search(category_lower):
             return cls.get_electronics_requirements()
-        elif any(
-            keyword in category_lower
-            for keyword in ["기계", "machine", "equipment", "tool", "motor"]
-        ):
+        elif _MACHINERY_CATEGORY_RE.search(category_lower):
             return cls.get_machinery_requirements()
-        elif any(
-            keyword in category_lower
-            for keyword in ["화학", "chemical", "substance", "material"]
-        ):
+        elif _CHEMICAL_CATEGORY_RE.search(category_lower):
             return cls.get_chemical_requirements()
         else:
             return cls.get_general_requirements()
@@ -275,6 +396,147 @@ class HSCodeClassificationResult(BaseModel):
     risk_assessment: str = Field(..., description="위험 평가")
 
 
+def _cached_system_message(text: str) -> SystemMessage:
+    """요청마다 동일한 지시문을 프롬프트 캐시 블록으로 감싼 시스템 메시지 (1시간 TTL)"""
+    return SystemMessage(
+        content=[
+            {
+                "type": "text",
+                "text": text,
+                "cache_control": {"type": "ephemeral", "ttl": "1h"},
+            }
+        ]
+    )
+
+
+# 정보 수집/분류 단계의 정적 지침 (사용자 요청과 제품 정보만 요청마다 달라짐)
+_INFORMATION_GATHERING_SYSTEM_MESSAGE = _cached_system_message(
+    """당신은 HSCode 분류 전문가입니다.
+정확한 HSCode 분류를 위해 필요한 상세 정보를 체계적으로 수집하는 것이 당신의 역할입니다.
+오분류를 방지하기 위해 필요한 모든 정보를 빠짐없이 요청해야 합니다.
+사용자가 이해하기 쉽도록 친절하고 명확하게 안내하십시오.
+절대로 JSON 형태가 아닌 자연어로만 응답하세요.
+
+**중요**: 정확한 HSCode 분류를 위해서는 제품의 본질적 특성을 정확히 파악해야 합니다. 단순한 제품명만으로는 오분류 위험이 높습니다.
+
+다음 정보들을 체계적으로 수집해야 합니다:
+
+## 1. 기본 제품 정보 (필수)
+- 정확한 제품명 및 모델명
+- 제조사 및 브랜드
+- 제품의 주요 기능 및 용도
+- 대상 사용자 (소비자용/업무용/산업용)
+
+## 2. 물리적 특성 (필수)
+- 재료 구성 (플라스틱, 금속, 유리 등의 비율)
+- 물리적 형태 (고체, 액체, 분말 등)
+- 크기, 무게, 색상
+- 포장 상태 및 포장재
+
+## 3. 기술적 사양 (전자제품의 경우 필수)
+- 배터리 용량 및 타입
+- 프로세서 종류 및 성능
+- 메모리 용량 (RAM/ROM)
+- 저장 용량
+- 디스플레이 사양 (크기, 해상도, 터치 여부)
+- 카메라 사양 (해상도, 개수)
+- 연결성 (WiFi, Bluetooth, 5G/4G, NFC 등)
+- 운영체제 및 버전
+- 센서 종류 (가속도계, 자이로스코프, 지문인식 등)
+
+## 4. 제조 및 화학 정보
+- 제조 공정 및 방법
+- 화학 조성 (해당되는 경우)
+- 원산지 정보
+
+## 5. 상업적 정보
+- 타겟 시장 (수출입 대상국)
+- 가격대 및 시장 포지셔닝
+- 경쟁 제품과의 차별점
+
+## 6. 분류 관련 정보
+- 유사 제품의 HSCode 참고 사례
+- 본질적 특성 (Essential Character) 식별
+- 적용 가능한 GRI 규칙 분석
+
+**사용자에게 질문해야 할 내용:**
+현재 제공된 정보만으로는 정확한 HSCode 분류가 어렵습니다. 오분류를 방지하기 위해 다음 정보를 상세히 제공해주세요:
+
+[구체적인 질문 목록을 생성하되, 사용자가 제공한 제품 카테고리에 특화된 질문들을 포함할 것]
+
+**참고**: 전자제품(특히 스마트폰, 태블릿 등)의 경우 기능과 기술 사양에 따라 HSCode가 크게 달라질 수 있습니다. 정확한 분류를 위해서는 상세한 기술적 정보가 필수입니다.
+"""
+)
+_CLASSIFICATION_SYSTEM_MESSAGE = _cached_system_message(
+    """당신은 HSCode 분류 전문가입니다.
+General Rules of Interpretation (GRI)를 순차적으로 적용하여 정확한 HSCode를 분류하십시오.
+필요한 경우 신뢰할 수 있는 공식 사이트에서 정보를 검색하여 분류 결과를 검증하십시오.
+불확실한 경우 신뢰도 점수를 낮추고 추가 확인이 필요함을 명시하십시오.
+
+## HSCode 분류 지침
+
+### 1. General Rules of Interpretation (GRI) 순차 적용
+**GRI 1**: 품목표의 표제와 부 또는 류의 주에 따라 분류
+**GRI 2**: 미완성품 또는 혼합물의 분류
+- 2a: 조립되지 않은 물품의 분류
+- 2b: 여러 재료로 구성된 물품의 분류
+**GRI 3**: 두 개 이상의 항에 분류 가능한 경우
+- 3a: 가장 구체적인 품목표시를 선택
+- 3b: 본질적 특성에 따른 분류
+- 3c: 번호순으로 나중에 오는 항에 분류
+**GRI 4**: 앞의 규칙으로 분류가 불가능한 경우, 가장 유사한 물품으로 분류
+**GRI 5**: 포장재의 분류 규칙
+**GRI 6**: 소호 단계의 분류 규칙
+
+### 2. 본질적 특성 (Essential Character) 분석
+- 제품의 핵심 기능과 용도
+- 가치, 부피, 무게, 역할 등을 종합적으로 고려
+- 복합 제품의 경우 어떤 구성요소가 본질적 특성을 결정하는지 판단
+
+### 3. 분류 우선순위
+1. 화학 조성 (해당되는 경우)
+2. 재료 구성
+3. 물리적 형태
+4. 기능 및 용도
+5. 제조 공정
+
+### 4. 전자제품 특화 고려사항
+- 스마트폰/태블릿: 통신 기능, 컴퓨팅 능력, 디스플레이 특성
+- 배터리: 용량, 화학 조성, 충전 방식
+- 반도체: 기능, 집적도, 용도
+- 디스플레이: 기술 방식, 크기, 해상도
+
+## 작업 수행 절차
+
+### 1단계: 정보 검증 및 웹 검색
+- 신뢰할 수 있는 공식 사이트에서 유사 제품 분류 사례 검색
+- WCO, 각국 관세청, 공인 분류 도구 활용
+- 최신 HS 명명법 및 분류 지침 확인
+
+### 2단계: GRI 규칙 적용
+- 각 GRI 규칙을 순차적으로 적용
+- 적용 가능한 여러 항목이 있는 경우 우선순위 결정
+- 본질적 특성 분석을 통한 최종 판단
+
+### 3단계: 분류 결과 검증
+- 분류 결과의 타당성 재검토
+- 대안 코드와의 비교 분석
+- 오분류 위험 요소 평가
+
+### 4단계: 권장사항 제공
+- Binding Ruling 신청 필요성 검토
+- 추가 확인이 필요한 사항 안내
+- 관련 규정 및 제한사항 고지
+
+## 출력 형식
+분석을 마친 후 HSCodeClassificationResult 도구를 호출하여 결과를 제출하십시오.
+HSCode는 10자리로 제공하십시오.
+
+**중요**: 불확실한 경우 신뢰도 점수를 낮추고 추가 확인이 필요함을 명시하십시오.
+"""
+)
+
+
 class HSCodeClassificationService:
     """HSCode 분류 전문 서비스"""
 
@@ -341,6 +603,11 @@ class HSCodeClassificationService:
         self.hscode_llm_with_search = self.hscode_llm.bind_tools(
             [self.hscode_web_search_tool]
         )
+        # 분류 결과를 스키마 도구 호출로 받는 모델
+        # (thinking과 웹 검색을 유지하기 위해 도구 선택을 강제하지 않음)
+        self.hscode_llm_for_classification = self.hscode_llm.bind_tools(
+            [self.hscode_web_search_tool, HSCodeClassificationResult]
+        )
 
         self.info_template = HSCodeRequiredInfoTemplate()
 
@@ -471,135 +738,24 @@ class HSCodeClassificationService:
 
         # 제품 카테고리 추출
         product_category = "general"
-        if any(
-            keyword in message_lower
-            for keyword in [
-                "스마트폰",
-                "smartphone",
-                "핸드폰",
-                "휴대폰",
-                "갤럭시",
-                "iphone",
-                "아이폰",
-            ]
-        ):
+        if _ELECTRONICS_RE.search(message_lower):
             product_category = "electronics"
-        elif any(
-            keyword in message_lower
-            for keyword in [
-                "노트북",
-                "laptop",
-                "컴퓨터",
-                "computer",
-                "태블릿",
-                "tablet",
-            ]
-        ):
-            product_category = "electronics"
-        elif any(
-            keyword in message_lower
-            for keyword in ["기계", "machine", "장비", "equipment", "모터", "motor"]
-        ):
+        elif _MACHINERY_RE.search(message_lower):
             product_category = "machinery"
-        elif any(
-            keyword in message_lower
-            for keyword in ["화학", "chemical", "약품", "물질", "substance"]
-        ):
+        elif _CHEMICAL_RE.search(message_lower):
             product_category = "chemical"
 
-        # 명시적인 HSCode 분류 요청 키워드 확인 (필수)
-        explicit_request_keywords = [
-            "hscode",
-            "hs code",
-            "관세율표",
-            "품목분류",
-            "세번",
-            "분류해줘",
-            "분류해주세요",
-            "분류 요청",
-            "분류 부탁",
-            "tariff",
-            "classification",
-            "customs",
-            "통관코드",
-            "수출입코드",
-            "관세코드",
-            "품목번호",
-            "상품분류",
-            "무역분류",
-            "분류해",
-            "분류를",
-            "코드 알려",
-            "코드를 알려",
-            "어떤 코드",
-        ]
-
-        has_explicit_request = any(
-            keyword in message_lower for keyword in explicit_request_keywords
-        )
-
-        # 명시적인 분류 요청이 없으면 무조건 불충분으로 판단
-        if not has_explicit_request:
-            requirements = self.info_template.get_requirements_by_category(
-                product_category
-            )
-            return False, product_category, requirements
-
-        # 질문 형태 확인
-        question_patterns = [
-            "?",
-            "？",
-            "뭐야",
-            "무엇",
-            "what",
-            "알려줘",
-            "알려주세요",
-            "어떻게",
-            "how",
-        ]
-        has_question_form = any(
-            pattern in message_lower for pattern in question_patterns
-        )
-
-        # 명시적 요청이 있어도 질문 형태가 없으면 불충분으로 판단
-        if not has_question_form:
-            requirements = self.info_template.get_requirements_by_category(
-                product_category
-            )
-            return False, product_category, requirements
-
-        # 상세 정보 키워드 체크
-        detailed_keywords = [
-            "모델",
-            "model",
-            "제조사",
-            "manufacturer",
-            "기능",
-            "function",
-            "사양",
-            "specification",
-            "재료",
-            "material",
-            "용도",
-            "purpose",
-            "크기",
-            "size",
-            "무게",
-            "weight",
-        ]
-        has_detailed_info = any(
-            keyword in message_lower for keyword in detailed_keywords
-        )
-
-        # 메시지 길이가 너무 짧은 경우 (50자 이하로 기준 상향)
-        if len(user_message.strip()) < 50:
-            requirements = self.info_template.get_requirements_by_category(
-                product_category
-            )
-            return False, product_category, requirements
-
-        # 명시적 요청과 질문 형태가 있지만 상세 정보가 부족한 경우도 불충분으로 판단
-        if not has_detailed_info:
+        # 불충분 판단 시 반환 값은 모두 같으므로 비용이 적은 검사부터 수행
+        # - 메시지 길이가 너무 짧은 경우 (50자 이하로 기준 상향)
+        # - 명시적인 HSCode 분류 요청 키워드가 없는 경우 (필수)
+        # - 명시적 요청이 있어도 질문 형태가 없는 경우
+        # - 명시적 요청과 질문 형태가 있지만 상세 정보가 부족한 경우
+        if (
+            len(user_message.strip()) < 50
+            or not _EXPLICIT_REQUEST_RE.search(message_lower)
+            or not _QUESTION_RE.search(message_lower)
+            or not _DETAILED_INFO_RE.search(message_lower)
+        ):
             requirements = self.info_template.get_requirements_by_category(
                 product_category
             )
@@ -653,40 +809,18 @@ class HSCodeClassificationService:
         self, user_query: str
     ) -> tuple[bool, float]:
         """HSCode 분류 의도 감지"""
-        hscode_keywords = [
-            "hscode",
-            "hs code",
-            "관세율표",
-            "품목분류",
-            "세번",
-            "tariff",
-            "classification",
-            "customs",
-            "통관",
-            "수출입",
-            "관세",
-            "품목번호",
-            "상품분류",
-            "무역분류",
-        ]
-
         query_lower = user_query.lower()
         keyword_matches = sum(
-            1 for keyword in hscode_keywords if keyword in query_lower
+            1 for keyword in _HSCODE_INTENT_KEYWORDS if keyword in query_lower
         )
 
         if keyword_matches > 0:
             return True, min(0.8 + (keyword_matches * 0.05), 1.0)
 
         # 제품명 + 분류 관련 키워드 조합 검사
-        product_indicators = ["제품", "상품", "물품", "기기", "장치", "부품"]
-        classification_indicators = ["분류", "코드", "번호", "확인"]
-
-        product_match = any(
-            indicator in query_lower for indicator in product_indicators
-        )
-        classification_match = any(
-            indicator in query_lower for indicator in classification_indicators
+        product_match = _PRODUCT_INDICATOR_RE.search(query_lower) is not None
+        classification_match = (
+            _CLASSIFICATION_INDICATOR_RE.search(query_lower) is not None
         )
 
         if product_match and classification_match:
@@ -695,147 +829,22 @@ class HSCodeClassificationService:
         return False, 0.0
 
     def _generate_information_gathering_prompt(self, user_query: str) -> str:
-        """상세 정보 수집을 위한 프롬프트 생성"""
-        return f"""당신은 HSCode 분류 전문가입니다. 다음 제품에 대한 정확한 HSCode 분류를 위해 필요한 상세 정보를 수집해야 합니다.
-
-사용자 요청: {user_query}
-
-**중요**: 정확한 HSCode 분류를 위해서는 제품의 본질적 특성을 정확히 파악해야 합니다. 단순한 제품명만으로는 오분류 위험이 높습니다.
-
-다음 정보들을 체계적으로 수집해야 합니다:
-
-## 1. 기본 제품 정보 (필수)
-- 정확한 제품명 및 모델명
-- 제조사 및 브랜드
-- 제품의 주요 기능 및 용도
-- 대상 사용자 (소비자용/업무용/산업용)
-
-## 2. 물리적 특성 (필수)
-- 재료 구성 (플라스틱, 금속, 유리 등의 비율)
-- 물리적 형태 (고체, 액체, 분말 등)
-- 크기, 무게, 색상
-- 포장 상태 및 포장재
-
-## 3. 기술적 사양 (전자제품의 경우 필수)
-- 배터리 용량 및 타입
-- 프로세서 종류 및 성능
-- 메모리 용량 (RAM/ROM)
-- 저장 용량
-- 디스플레이 사양 (크기, 해상도, 터치 여부)
-- 카메라 사양 (해상도, 개수)
-- 연결성 (WiFi, Bluetooth, 5G/4G, NFC 등)
-- 운영체제 및 버전
-- 센서 종류 (가속도계, 자이로스코프, 지문인식 등)
-
-## 4. 제조 및 화학 정보
-- 제조 공정 및 방법
-- 화학 조성 (해당되는 경우)
-- 원산지 정보
-
-## 5. 상업적 정보
-- 타겟 시장 (수출입 대상국)
-- 가격대 및 시장 포지셔닝
-- 경쟁 제품과의 차별점
-
-## 6. 분류 관련 정보
-- 유사 제품의 HSCode 참고 사례
-- 본질적 특성 (Essential Character) 식별
-- 적용 가능한 GRI 규칙 분석
-
-**사용자에게 질문해야 할 내용:**
-현재 제공된 정보만으로는 정확한 HSCode 분류가 어렵습니다. 오분류를 방지하기 위해 다음 정보를 상세히 제공해주세요:
+        """상세 정보 수집을 위한 프롬프트 생성 (수집 지침은 시스템 메시지에 포함)"""
+        return f"""다음 제품의 정확한 HSCode 분류에 필요한 상세 정보를 수집하십시오.
 
-[구체적인 질문 목록을 생성하되, 사용자가 제공한 제품 카테고리에 특화된 질문들을 포함할 것]
-
-**참고**: 전자제품(특히 스마트폰, 태블릿 등)의 경우 기능과 기술 사양에 따라 HSCode가 크게 달라질 수 있습니다. 정확한 분류를 위해서는 상세한 기술적 정보가 필수입니다.
-"""
+<user_request>{user_query}</user_request>"""
 
     def _generate_classification_prompt(
         self, user_query: str, product_specs: ProductSpecification
     ) -> str:
-        """HSCode 분류를 위한 프롬프트 생성"""
-        specs_json = product_specs.model_dump_json(indent=2)
-
-        return f"""당신은 HSCode 분류 전문가입니다. 다음 제품 정보를 바탕으로 정확한 HSCode를 분류하십시오.
+        """HSCode 분류를 위한 프롬프트 생성 (분류 지침은 시스템 메시지에 포함)"""
+        # 들여쓰기 없는 JSON으로 입력 토큰 절약
+        specs_json = product_specs.model_dump_json(exclude_none=True)
 
-원래 사용자 요청: {user_query}
+        return f"""다음 제품 정보를 바탕으로 정확한 HSCode를 분류하십시오.
 
-수집된 제품 상세 정보:
-{specs_json}
-
-## HSCode 분류 지침
-
-### 1. General Rules of Interpretation (GRI) 순차 적용
-**GRI 1**: 품목표의 표제와 부 또는 류의 주에 따라 분류
-**GRI 2**: 미완성품 또는 혼합물의 분류
-- 2a: 조립되지 않은 물품의 분류
-- 2b: 여러 재료로 구성된 물품의 분류
-**GRI 3**: 두 개 이상의 항에 분류 가능한 경우
-- 3a: 가장 구체적인 품목표시를 선택
-- 3b: 본질적 특성에 따른 분류
-- 3c: 번호순으로 나중에 오는 항에 분류
-**GRI 4**: 앞의 규칙으로 분류가 불가능한 경우, 가장 유사한 물품으로 분류
-**GRI 5**: 포장재의 분류 규칙
-**GRI 6**: 소호 단계의 분류 규칙
-
-### 2. 본질적 특성 (Essential Character) 분석
-- 제품의 핵심 기능과 용도
-- 가치, 부피, 무게, 역할 등을 종합적으로 고려
-- 복합 제품의 경우 어떤 구성요소가 본질적 특성을 결정하는지 판단
-
-### 3. 분류 우선순위
-1. 화학 조성 (해당되는 경우)
-2. 재료 구성
-3. 물리적 형태
-4. 기능 및 용도
-5. 제조 공정
-
-### 4. 전자제품 특화 고려사항
-- 스마트폰/태블릿: 통신 기능, 컴퓨팅 능력, 디스플레이 특성
-- 배터리: 용량, 화학 조성, 충전 방식
-- 반도체: 기능, 집적도, 용도
-- 디스플레이: 기술 방식, 크기, 해상도
-
-## 작업 수행 절차
-
-### 1단계: 정보 검증 및 웹 검색
-- 신뢰할 수 있는 공식 사이트에서 유사 제품 분류 사례 검색
-- WCO, 각국 관세청, 공인 분류 도구 활용
-- 최신 HS 명명법 및 분류 지침 확인
-
-### 2단계: GRI 규칙 적용
-- 각 GRI 규칙을 순차적으로 적용
-- 적용 가능한 여러 항목이 있는 경우 우선순위 결정
-- 본질적 특성 분석을 통한 최종 판단
-
-### 3단계: 분류 결과 검증
-- 분류 결과의 타당성 재검토
-- 대안 코드와의 비교 분석
-- 오분류 위험 요소 평가
-
-### 4단계: 권장사항 제공
-- Binding Ruling 신청 필요성 검토
-- 추가 확인이 필요한 사항 안내
-- 관련 규정 및 제한사항 고지
-
-## 출력 형식
-다음 JSON 형식으로 결과를 제공하십시오:
-
-```json
-{{
-  "hscode": "분류된 HSCode (10자리)",
-  "confidence_score": 0.95,
-  "classification_reason": "상세한 분류 근거",
-  "gri_application": "적용된 GRI 규칙 및 분석 과정",
-  "alternative_codes": ["대안 코드1", "대안 코드2"],
-  "verification_sources": ["검증에 사용된 출처"],
-  "recommendations": ["권장사항 목록"],
-  "risk_assessment": "분류 위험 평가"
-}}
-```
-
-**중요**: 불확실한 경우 신뢰도 점수를 낮추고 추가 확인이 필요함을 명시하십시오.
-"""
+<user_request>{user_query}</user_request>
+<product_specs>{specs_json}</product_specs>"""
 
     async def process_hscode_classification(
         self,
@@ -874,13 +883,7 @@ class HSCodeClassificationService:
             )
 
             # 시스템 메시지 구성
-            system_message = SystemMessage(
-                content="""당신은 HSCode 분류 전문가입니다. 
-정확한 HSCode 분류를 위해 필요한 상세 정보를 체계적으로 수집하는 것이 당신의 역할입니다.
-오분류를 방지하기 위해 필요한 모든 정보를 빠짐없이 요청해야 합니다.
-사용자가 이해하기 쉽도록 친절하고 명확하게 안내하십시오.
-절대로 JSON 형태가 아닌 자연어로만 응답하세요."""
-            )
+            system_message = _INFORMATION_GATHERING_SYSTEM_MESSAGE
 
             # 사용자 메시지 구성
             user_message = HumanMessage(content=info_prompt)
@@ -888,11 +891,6 @@ class HSCodeClassificationService:
             # LLM 호출 (CancelledError 처리)
             response = await self.hscode_llm.ainvoke([system_message, user_message])
 
-            # 타입 안전 텍스트 추출
-            from app.utils.llm_response_parser import (
-                extract_text_from_anthropic_response,
-            )
-
             # information_request JSON 응답 대신 자연어 텍스트만 반환
             response_text = extract_text_from_anthropic_response(response)
 
@@ -923,6 +921,14 @@ class HSCodeClassificationService:
 
     async def _classify_hscode(self, chat_request: ChatRequest) -> Dict[str, Any]:
         """2단계: HSCode 분류 수행 (CancelledError 처리 포함)"""
+        # 분류 프롬프트는 메시지만으로 만들어지고 세션 기록/카테고리를 쓰지 않으므로
+        # 메시지가 같으면 LLM 입력도 같음 (프롬프트에 맥락을 추가하면 키에도 포함할 것)
+        cache_key = _response_cache_key("classification", "", chat_request.message)
+        cached = _get_cached_response(cache_key)
+        if cached is not None:
+            logger.info("HSCode 분류 결과 캐시 적중")
+            # 호출 측이 응답을 수정해도 캐시된 결과가 바뀌지 않도록 복사본 반환
+            return copy.deepcopy(cached)
 
         try:
             # 제품 정보 파싱 (실제 구현에서는 이전 단계에서 수집된 정보를 사용)
@@ -940,54 +946,37 @@ class HSCodeClassificationService:
             )
 
             # 웹 검색 포함 시스템 메시지
-            system_message = SystemMessage(
-                content="""당신은 HSCode 분류 전문가입니다.
-General Rules of Interpretation (GRI)를 순차적으로 적용하여 정확한 HSCode를 분류하십시오.
-필요한 경우 신뢰할 수 있는 공식 사이트에서 정보를 검색하여 분류 결과를 검증하십시오.
-불확실한 경우 신뢰도 점수를 낮추고 추가 확인이 필요함을 명시하십시오."""
-            )
+            system_message = _CLASSIFICATION_SYSTEM_MESSAGE
 
             # 사용자 메시지 구성
             user_message = HumanMessage(content=classification_prompt)
 
-            # 웹 검색 포함 LLM 호출
-            response = await self.hscode_llm_with_search.ainvoke(
+            # 웹 검색 및 결과 도구 포함 LLM 호출
+            response = await self.hscode_llm_for_classification.ainvoke(
                 [system_message, user_message]
             )
+            response_text = extract_text_from_anthropic_response(response)
 
-            # JSON 응답 파싱 시도
-            try:
-                # 응답에서 JSON 부분 추출 (타입 안전)
-                json_pattern = r"```json\s*(\{.*?\})\s*```"
-                response_text = extract_text_from_anthropic_response(response)
-                json_match = re.search(json_pattern, response_text, re.DOTALL)
-
-                if json_match:
-                    classification_result = json.loads(json_match.group(1))
-
-                    return {
-                        "type": "classification_result",
-                        "stage": HSCodeClassificationStage.CLASSIFICATION,
-                        "result": classification_result,
-                        "full_response": extract_text_from_anthropic_response(response),
-                        "next_stage": HSCodeClassificationStage.VERIFICATION,
-                    }
-                else:
-                    # JSON 형식이 없으면 일반 응답으로 처리
-                    return {
-                        "type": "classification_response",
-                        "stage": HSCodeClassificationStage.CLASSIFICATION,
-                        "message": extract_text_from_anthropic_response(response),
-                        "next_stage": HSCodeClassificationStage.VERIFICATION,
-                    }
-
-            except json.JSONDecodeError:
-                return {
-                    "type": "classification_response",
+            classification_result = self._parse_classification_tool_call(response)
+            if classification_result is not None:
+                result = {
+                    "type": "classification_result",
                     "stage": HSCodeClassificationStage.CLASSIFICATION,
-                    "message": extract_text_from_anthropic_response(response),
+                    "result": classification_result,
+                    "full_response": response_text,
                     "next_stage": HSCodeClassificationStage.VERIFICATION,
                 }
+                # 스키마 검증을 통과한 분류 결과만 캐시
+                _cache_response(cache_key, copy.deepcopy(result))
+                return result
+
+            # 결과 도구를 호출하지 않았으면 일반 응답으로 처리
+            return {
+                "type": "classification_response",
+                "stage": HSCodeClassificationStage.CLASSIFICATION,
+                "message": response_text,
+                "next_stage": HSCodeClassificationStage.VERIFICATION,
+            }
 
         except asyncio.CancelledError:
             logger.warning("HSCode 분류 중 스트리밍이 취소됨")
@@ -1016,6 +1005,19 @@ General Rules of Interpretation (GRI)를 순차적으로 적용하여 정확한
                 "error_detail": str(e),
             }
 
+    def _parse_classification_tool_call(self, response) -> Optional[Dict[str, Any]]:
+        """HSCodeClassificationResult 도구 호출 인자를 검증하여 dict로 변환"""
+        for tool_call in response.tool_calls:
+            if tool_call["name"] != HSCodeClassificationResult.__name__:
+                continue
+            try:
+                return HSCodeClassificationResult.model_validate(
+                    tool_call["args"]
+                ).model_dump()
+            except ValidationError as e:
+                logger.warning(f"HSCode 분류 결과 스키마 검증 실패: {e}")
+        return None
+
     async def _verify_classification(self, chat_request: ChatRequest) -> Dict[str, Any]:
         """3단계: 분류 결과 검증"""
 
@@ -1071,52 +1073,25 @@ General Rules of Interpretation (GRI)를 순차적으로 적용하여 정확한
         Returns:
             화이트리스트 검색 결과와 정보 요구사항을 포함한 응답
         """
-        try:
-            # Step-Back 프롬프팅을 사용한 제품 키워드 추출
-            keyword_extraction_prompt = f"""
-            다음 사용자 메시지에서 HSCode 검색을 위한 핵심 키워드를 추출해주세요.
-
-            **Step-Back Analysis (원칙 정의):**
-            HSCode 검색에서 중요한 키워드는:
-            1. 제품의 핵심 기능을 나타내는 명사
-            2. 재료나 소재를 나타내는 단어
-            3. 용도나 목적을 나타내는 단어
-            4. 기술적 특징을 나타내는 단어
-
-            **사용자 메시지:** "{user_message}"
-
-            **Chain-of-Thought 분석:**
-            1. 제품명 식별: 
-            2. 핵심 기능 추출:
-            3. 재료/소재 확인:
-            4. 용도 파악:
-
-            **최종 검색 키워드 (영어 3-5개):**
-            """
-
-            # 키워드 추출
-            keyword_response = await self.hscode_llm.ainvoke(
-                [
-                    SystemMessage(
-                        content="HSCode 검색을 위한 키워드 추출 전문가입니다."
-                    ),
-                    HumanMessage(content=keyword_extraction_prompt),
-                ]
-            )
-
-            extracted_keywords = extract_text_from_anthropic_response(
-                keyword_response
-            ).strip()
-            logger.info(f"추출된 검색 키워드: {extracted_keywords}")
+        cache_key = _response_cache_key("preliminary", product_category, user_message)
+        cached = _get_cached_response(cache_key)
+        if cached is not None:
+            logger.info("초기 HSCode 검색 결과 캐시 적중")
+            return cached
 
+        try:
             # 화이트리스트 기반 웹 검색 수행
+            # (검색 키워드는 별도 LLM 호출 없이 같은 요청 안에서 도출)
             web_search_prompt = f"""
             다음 제품에 대한 HSCode 분류 정보를 신뢰할 수 있는 공식 사이트에서 검색해주세요.
 
             **검색 대상:** {user_message}
-            **핵심 키워드:** {extracted_keywords}
             **제품 카테고리:** {product_category}
 
+            **검색 키워드 도출 (Step-Back Analysis):**
+            검색 전에 제품명, 핵심 기능을 나타내는 명사, 재료/소재, 용도/목적,
+            기술적 특징을 파악하여 영어 검색 키워드 3-5개를 정하고 이를 사용해 검색하세요.
+
             **검색 목표:**
             1. 해당 제품의 예상 HSCode 범위 확인
             2. 유사 제품의 분류 사례 찾기
@@ -1155,6 +1130,7 @@ General Rules of Interpretation (GRI)를 순차적으로 적용하여 정확한
 **다음 단계:** 위의 상세 정보를 제공해주시면, 관세율표 해석 통칙(GRI)을 적용하여 **법적으로 정확한 HSCode 분류**를 수행해드리겠습니다.
 """
 
+            _cache_response(cache_key, combined_response)
             return combined_response
 
         except Exception as e:
@@ -1267,8 +1243,6 @@ General Rules of Interpretation (GRI)를 순차적으로 적용하여 정확한
             result_text = extract_text_from_anthropic_response(classification_response)
 
             # JSON 블록 추출
-            import re
-
             json_match = re.search(r"```json\s*(\{.*?\})\s*```", result_text, re.DOTALL)
             if json_match:
                 result_data = json.loads(json_match.group(1))
@@ -23,6 +23,73 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# HSCode 형식별 패턴을 하나의 정규식으로 결합 (그룹 번호가 작을수록 우선순위 높음)
+_HSCODE_TEXT_RE = re.compile(
+    r"\b(?:"
+    r"(\d{4}\.\d{2}\.\d{2}\.\d{2})"  # 10자리 (한국, 중국, 미국)
+    r"|(\d{4}\.\d{2}\.\d{2})"  # 8자리 (베트남, 홍콩)
+    r"|(\d{4}\.\d{2})"  # 6자리 (국제 표준)
+    r"|(\d{10})"  # 10자리 (점 없음)
+    r"|(\d{8})"  # 8자리 (점 없음)
+    r"|(\d{6})"  # 6자리 (점 없음)
+    r")\b"
+)
+_DIGIT_RE = re.compile(r"\d")
+
+# 질문에 HSCode가 명시되었다고 볼 수 있는 키워드
+_HS_KEYWORD = r"(?:hs\s*code|(?<![a-z])hs(?![a-z])|세번|품목번호)"
+_HS_KEYWORD_RE = re.compile(_HS_KEYWORD, re.IGNORECASE)
+# 키워드 바로 뒤에 오는 코드 (예: "HS 851712", "HSCode: 8517.12.00", "세번은 8517120000")
+_LABELLED_HSCODE_RE = re.compile(
+    _HS_KEYWORD + r"\s*(?:코드)?\s*[:：]?\s*(?:[은는]\s*)?"
+    r"(\d{4}(?:\.?\d{2}){1,3})(?![\d.])",
+    re.IGNORECASE,
+)
+# 점으로 구분된 코드 (예: 8517.12, 8517.12.00, 8517.12.00.00)
+_DOTTED_HSCODE_RE = re.compile(r"(?<![\d.])\d{4}\.\d{2}(?:\.\d{2}){0,2}(?![\d.])")
+
+# 식품 키워드를 하나의 alternation으로 묶어 한 번의 스캔으로 확인
+_FOOD_KEYWORD_RE = re.compile(
+    "|".join(
+        ("족발", "김치", "고기", "과일", "야채", "음식", "식품", "농산물", "수산물")
+    )
+)
+
+# 상세 페이지 버튼 템플릿: (type, label, url, hscode 외 쿼리 파라미터)
+_DETAIL_BUTTON_TEMPLATES = (
+    ("REGULATION", "규제 정보 상세보기", "/regulation", {"country": "ALL"}),
+    ("STATISTICS", "무역 통계 상세보기", "/statistics", {"period": "latest"}),
+    ("SHIPMENT_TRACKING", "화물 추적 정보", "/tracking", {}),
+)
+
+
+def _is_plausible_heading(code: str) -> bool:
+    """앞 4자리가 실제 HS 호가 될 수 있는지 확인 (1~97류, 19·20류의 호는 01~09뿐)"""
+    chapter, heading = int(code[:2]), int(code[2:4])
+    if not 1 <= chapter <= 97 or chapter == 77:
+        return False
+    # 연도 표기(2024.01 등)는 19·20류의 호 범위를 벗어남
+    return not (chapter in (19, 20) and heading >= 10)
+
+
+def _extract_explicit_hscode(text: str) -> Optional[str]:
+    """
+    사용자 질문에 명시된 HSCode 추출.
+    HS 키워드가 있고 키워드 뒤에 코드가 오거나 점 표기 코드가 있을 때만 인정하며,
+    구분자 없는 숫자열(가격, 전화번호 등)만으로는 HSCode로 보지 않음.
+    """
+    if not _HS_KEYWORD_RE.search(text):
+        return None
+
+    labelled = _LABELLED_HSCODE_RE.search(text)
+    if labelled and _is_plausible_heading(labelled.group(1)):
+        return labelled.group(1).replace(".", "")
+
+    for match in _DOTTED_HSCODE_RE.finditer(text):
+        if _is_plausible_heading(match.group(0)):
+            return match.group(0).replace(".", "")
+    return None
+
 
 class HSCodeService:
     """HSCode 검색 서비스"""
@@ -81,6 +148,22 @@ class HSCodeService:
             # 1단계: 쿼리 타입 분석
             query_type = self._analyze_query_type(user_query)
 
+            # 질문에 HSCode가 명시된 경우 LLM 추출과 웹 검색 없이 바로 응답
+            explicit_hscode = _extract_explicit_hscode(user_query)
+            if explicit_hscode:
+                logger.info(f"질문에 명시된 HSCode 사용: {explicit_hscode}")
+                hscodes = [
+                    HSCodeResult(
+                        country="KR",
+                        country_name="한국",
+                        hscode=explicit_hscode,
+                        description="질문에 명시된 HSCode",
+                        confidence=0.8,
+                    )
+                ]
+                detail_buttons = self._generate_detail_buttons(hscodes, query_type)
+                return self._generate_response(query_type, hscodes, detail_buttons)
+
             # 2단계: 제품 정보 추출
             product_info = await self._extract_product_info(user_query)
 
@@ -274,20 +357,20 @@ class HSCodeService:
 
     def _extract_hscode_from_text(self, text: str) -> Optional[str]:
         """텍스트에서 HSCode 추출"""
-        # 다양한 HSCode 패턴 매칭
-        patterns = [
-            r"\b\d{4}\.\d{2}\.\d{2}\.\d{2}\b",  # 10자리 (한국, 중국, 미국)
-            r"\b\d{4}\.\d{2}\.\d{2}\b",  # 8자리 (베트남, 홍콩)
-            r"\b\d{4}\.\d{2}\b",  # 6자리 (국제 표준)
-            r"\b\d{10}\b",  # 10자리 (점 없음)
-            r"\b\d{8}\b",  # 8자리 (점 없음)
-            r"\b\d{6}\b",  # 6자리 (점 없음)
-        ]
+        # 모든 형식이 최소 6자리 숫자를 포함하므로 숫자가 없는 텍스트는 바로 제외
+        if len(text) < 6 or not _DIGIT_RE.search(text):
+            return None
 
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(0).replace(".", "")
+        # 한 번의 스캔으로 모든 형식을 찾고, 기존과 같이 자릿수가 긴 형식을 우선함
+        best_match = None
+        for match in _HSCODE_TEXT_RE.finditer(text):
+            if best_match is None or match.lastindex < best_match.lastindex:
+                best_match = match
+                if match.lastindex == 1:
+                    break
+
+        if best_match:
+            return best_match.group(0).replace(".", "")
 
         return None
 
@@ -321,42 +404,22 @@ class HSCodeService:
         self, hscodes: List[HSCodeResult], query_type: QueryType
     ) -> List[DetailButton]:
         """상세 페이지 버튼 생성"""
-        buttons = []
-
         # 기본 HSCode (한국 기준)
         primary_hscode = ""
         if hscodes:
             korea_result = next((r for r in hscodes if r.country == "KR"), None)
             primary_hscode = korea_result.hscode if korea_result else hscodes[0].hscode
 
-        buttons.append(
-            DetailButton(
-                type="REGULATION",
-                label="규제 정보 상세보기",
-                url="/regulation",
-                query_params={"hscode": primary_hscode, "country": "ALL"},
-            )
-        )
-
-        buttons.append(
-            DetailButton(
-                type="STATISTICS",
-                label="무역 통계 상세보기",
-                url="/statistics",
-                query_params={"hscode": primary_hscode, "period": "latest"},
+        # 템플릿 값은 이미 검증된 상수이므로 검증 없이 인스턴스 생성
+        return [
+            DetailButton.model_construct(
+                type=button_type,
+                label=label,
+                url=url,
+                query_params={"hscode": primary_hscode, **extra_params},
             )
-        )
-
-        buttons.append(
-            DetailButton(
-                type="SHIPMENT_TRACKING",
-                label="화물 추적 정보",
-                url="/tracking",
-                query_params={"hscode": primary_hscode},
-            )
-        )
-
-        return buttons
+            for button_type, label, url, extra_params in _DETAIL_BUTTON_TEMPLATES
+        ]
 
     def _generate_response(
         self,
@@ -460,15 +523,4 @@ class HSCodeService:
 
     def _is_food(self, product_name: str) -> bool:
         """식품 여부 확인"""
-        food_keywords = [
-            "족발",
-            "김치",
-            "고기",
-            "과일",
-            "야채",
-            "음식",
-            "식품",
-            "농산물",
-            "수산물",
-        ]
-        return any(keyword in product_name for keyword in food_keywords)
+        return _FOOD_KEYWORD_RE.search(product_name) is not None
@@ -6,16 +6,27 @@
 
 import asyncio
 import logging
+import time
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
+from uuid import UUID
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import BackgroundTasks
+from langchain_core.messages import AIMessage, HumanMessage
 
+from app.db import crud
 from app.models.db_models import ChatSession, DetailPageAnalysis
 from app.db.session import SessionLocal
+from app.services.detail_page_service import build_enhanced_analysis_values
+from app.services.enhanced_detail_generator import get_detail_generator
 
 logger = logging.getLogger(__name__)
 
+# 존재가 확인된 세션 UUID -> 확인 시각 (세션은 삭제되는 경우가 드물어 짧게 캐시)
+SESSION_EXISTS_CACHE_TTL = 300
+_SESSION_EXISTS_CACHE: Dict[str, float] = {}
+
 
 class ImprovedTransactionService:
     """개선된 트랜잭션 처리 서비스"""
@@ -31,8 +42,6 @@ class ImprovedTransactionService:
             (session_obj, is_new_session)
         """
         try:
-            from app.db import crud
-
             # 세션 생성/조회
             session_obj = await crud.chat.get_or_create_session(
                 db=db, user_id=user_id, session_uuid_str=session_uuid_str
@@ -58,8 +67,6 @@ class ImprovedTransactionService:
     async def save_user_message_simple(db: AsyncSession, history, message: str) -> bool:
         """사용자 메시지 단순 저장"""
         try:
-            from langchain_core.messages import HumanMessage
-
             human_message = HumanMessage(content=message)
             await history.aadd_message(human_message)
             await db.commit()
@@ -78,8 +85,6 @@ class ImprovedTransactionService:
     ) -> bool:
         """AI 메시지 단순 저장"""
         try:
-            from langchain_core.messages import AIMessage
-
             ai_message = AIMessage(content=ai_response)
             await history.aadd_message(ai_message)
             await db.commit()
@@ -155,8 +160,6 @@ class ImprovedTransactionService:
     ):
         """재시도 로직이 있는 백그라운드 분석"""
 
-        from app.services.enhanced_detail_generator import EnhancedDetailGenerator
-
         for attempt in range(max_retries):
             try:
                 async with SessionLocal() as bg_db:
@@ -173,7 +176,7 @@ class ImprovedTransactionService:
                         continue
 
                     # 상세 정보 생성
-                    detail_generator = EnhancedDetailGenerator()
+                    detail_generator = get_detail_generator()
                     enhanced_info = (
                         await detail_generator.generate_comprehensive_detail_info(
                             hscode=hscode,
@@ -205,24 +208,31 @@ class ImprovedTransactionService:
 
     @staticmethod
     async def _check_session_exists(db: AsyncSession, session_uuid: str) -> bool:
-        """세션 존재 여부 확인 (단순화)"""
-        try:
-            from uuid import UUID
-            from sqlalchemy import select
+        """세션 존재 여부 확인 (확인된 세션은 일정 시간 캐시)"""
+        checked_at = _SESSION_EXISTS_CACHE.get(session_uuid)
+        if checked_at and time.time() - checked_at < SESSION_EXISTS_CACHE_TTL:
+            return True
 
-            stmt = (
-                select(ChatSession.session_uuid)
-                .where(ChatSession.session_uuid == UUID(session_uuid))
-                .limit(1)
+        try:
+            stmt = select(
+                exists().where(ChatSession.session_uuid == UUID(session_uuid))
             )
-
             result = await db.execute(stmt)
-            return result.scalar() is not None
+            session_exists = bool(result.scalar())
 
         except Exception as e:
             logger.warning(f"세션 존재 확인 실패: {e}")
             return False
 
+        # 아직 커밋되지 않은 세션을 기다리는 재시도가 있으므로 존재하는 경우만 캐시
+        if session_exists:
+            _SESSION_EXISTS_CACHE[session_uuid] = time.time()
+            if len(_SESSION_EXISTS_CACHE) > 4096:
+                oldest = sorted(_SESSION_EXISTS_CACHE, key=_SESSION_EXISTS_CACHE.get)
+                for key in oldest[:2048]:
+                    del _SESSION_EXISTS_CACHE[key]
+        return session_exists
+
     @staticmethod
     async def _save_analysis_simple(
         bg_db: AsyncSession,
@@ -235,9 +245,10 @@ class ImprovedTransactionService:
     ):
         """분석 결과 단순 저장"""
         try:
-            # 기존 분석 결과 확인
-            from sqlalchemy import select
+            info_values = build_enhanced_analysis_values(enhanced_info)
+            verified_at = datetime.now(timezone.utc)
 
+            # 기존 분석 결과 확인
             stmt = select(DetailPageAnalysis).where(
                 DetailPageAnalysis.message_hash == message_hash
             )
@@ -246,45 +257,30 @@ class ImprovedTransactionService:
 
             if existing_analysis:
                 # 기존 레코드 업데이트
-                for key, value in enhanced_info.items():
-                    if hasattr(existing_analysis, key):
-                        setattr(existing_analysis, key, value)
-
-                setattr(existing_analysis, "last_verified_at", datetime.utcnow())
+                for key, value in info_values.items():
+                    setattr(existing_analysis, key, value)
+                setattr(existing_analysis, "last_verified_at", verified_at)
 
             else:
                 # 새 레코드 생성 (단순화된 버전)
-                new_analysis = DetailPageAnalysis(
-                    user_id=user_id,
-                    session_uuid=session_uuid,  # 방안1: 단순화된 외래키
-                    message_hash=message_hash,
-                    original_message=user_context,
-                    detected_intent="hscode_analysis",
-                    detected_hscode=hscode,
-                    confidence_score=0.9,
-                    processing_time_ms=0,
-                    analysis_source="enhanced_ai_generation",
-                    analysis_metadata=enhanced_info.get("generation_metadata", {}),
-                    web_search_performed=True,
-                    web_search_results=None,
-                    # 상세 정보
-                    tariff_info=enhanced_info.get("tariff_info", {}),
-                    trade_agreement_info=enhanced_info.get("trade_agreement_info", {}),
-                    regulation_info=enhanced_info.get("regulation_info", {}),
-                    similar_hscodes_detailed=enhanced_info.get(
-                        "similar_hscodes_detailed", {}
-                    ),
-                    market_analysis=enhanced_info.get("market_analysis", {}),
-                    verification_status=enhanced_info.get(
-                        "verification_status", "ai_generated"
-                    ),
-                    data_quality_score=enhanced_info.get("data_quality_score", 0.0),
-                    needs_update=enhanced_info.get("needs_update", False),
-                    last_verified_at=datetime.utcnow(),
-                    expert_opinion=enhanced_info.get("expert_opinion"),
-                )
-
-                bg_db.add(new_analysis)
+                values = {
+                    "user_id": user_id,
+                    "session_uuid": session_uuid,  # 방안1: 단순화된 외래키
+                    "message_hash": message_hash,
+                    "original_message": user_context,
+                    "detected_intent": "hscode_analysis",
+                    "detected_hscode": hscode,
+                    "confidence_score": 0.9,
+                    "processing_time_ms": 0,
+                    "analysis_source": "enhanced_ai_generation",
+                    "web_search_performed": True,
+                    "verification_status": "ai_generated",
+                    "data_quality_score": 0.0,
+                    "needs_update": False,
+                    **info_values,
+                    "last_verified_at": verified_at,
+                }
+                bg_db.add(DetailPageAnalysis(**values))
 
             await bg_db.commit()
             logger.info("분석 결과 저장 완료")
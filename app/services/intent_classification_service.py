@@ -7,6 +7,8 @@ Step-Back, Chain-of-Thought, Self-Consistency 기법 적용
 import logging
 import json
 import re
+import time
+import hashlib
 import asyncio
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
@@ -23,6 +25,22 @@ from app.utils.llm_response_parser import extract_text_from_anthropic_response
 
 logger = logging.getLogger(__name__)
 
+# LLM 호출 전 명백한 의도를 판별하기 위한 사전 필터 정규식
+# (한글 조사가 바로 붙는 경우를 위해 \b 대신 전후방 탐색 사용)
+# 컨테이너 번호 (소유자 코드 4자 + 숫자 7자리)
+_CARGO_RE = re.compile(r"(?<![A-Za-z0-9])[A-Z]{4}\d{7}(?!\d)")
+# 숫자만으로 된 화물/운송장 번호 (전화번호와 구분되지 않으므로 화물 키워드와 함께일 때만 인정)
+_CARGO_DIGITS_RE = re.compile(r"(?<!\d)\d{11,13}(?!\d)")
+_CARGO_KEYWORD_RE = re.compile(
+    r"화물|운송장|송장|선하증권|컨테이너|배송|추적|(?<![A-Za-z])B/?L(?![A-Za-z])"
+    r"|container|tracking",
+    re.IGNORECASE,
+)
+_HSCODE_RE = re.compile(
+    r"(?<![\d.])\d{4}\.\d{2}\.\d{2,4}(?!\d)|(?<![A-Za-z])HS[- ]?code(?![A-Za-z])",
+    re.IGNORECASE,
+)
+
 
 class IntentType(Enum):
     """의도 타입 열거형"""
@@ -246,18 +264,47 @@ Return only JSON:
 
     def _get_cache_key(self, message: str) -> str:
         """캐시 키 생성 (메시지의 해시)"""
-        import hashlib
-
         return hashlib.md5(message.encode("utf-8")).hexdigest()
 
     def _is_cache_valid(self, cache_entry: Dict[str, Any]) -> bool:
         """캐시 유효성 확인"""
-        import time
-
         return time.time() - cache_entry.get("timestamp", 0) < self._cache_ttl
 
+    @staticmethod
+    def _prefilter_intent(message: str) -> Optional[IntentClassificationResult]:
+        """정규식으로 명백한 화물번호/HSCode 질의를 판별하여 LLM 호출을 생략"""
+        cargo_match = _CARGO_RE.search(message)
+        if not cargo_match and _CARGO_KEYWORD_RE.search(message):
+            cargo_match = _CARGO_DIGITS_RE.search(message)
+        if cargo_match:
+            return IntentClassificationResult(
+                intent_type=IntentType.CARGO_TRACKING,
+                confidence_score=0.99,
+                reasoning_steps=["Regex prefilter: cargo number pattern matched"],
+                extracted_entities={"cargo_numbers": [cargo_match.group()]},
+                alternative_intents=[],
+            )
+
+        hscode_match = _HSCODE_RE.search(message)
+        if hscode_match:
+            return IntentClassificationResult(
+                intent_type=IntentType.HSCODE_CLASSIFICATION,
+                confidence_score=0.99,
+                reasoning_steps=["Regex prefilter: HSCode pattern matched"],
+                extracted_entities={"hscode_keywords": [hscode_match.group()]},
+                alternative_intents=[],
+            )
+
+        return None
+
     async def classify_intent(self, message: str) -> IntentClassificationResult:
         """고급 프롬프트 엔지니어링 기법을 사용한 의도 분류 (캐싱 적용)"""
+        # 정규식 사전 필터: 명백한 경우 LLM 호출 없이 즉시 반환
+        prefiltered = self._prefilter_intent(message)
+        if prefiltered:
+            logger.info(f"의도 분류 사전 필터 적중: {prefiltered.intent_type.value}")
+            return prefiltered
+
         # 캐시 확인
         cache_key = self._get_cache_key(message)
         if cache_key in self._cache and self._is_cache_valid(self._cache[cache_key]):
@@ -273,8 +320,6 @@ Return only JSON:
                 result = await self._classify_intent_with_retry(message)
 
                 # 결과를 캐시에 저장
-                import time
-
                 self._cache[cache_key] = {"result": result, "timestamp": time.time()}
 
                 # 캐시 크기 제한 (최대 100개 항목)
@@ -25,6 +25,54 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# 폴백 분류에서 사용하는 HSCode 패턴 (모듈 로드 시 한 번만 컴파일)
+_HSCODE_PATTERN_RE = re.compile(r"\b(\d{4}\.\d{2}|\d{6}|\d{10})\b")
+
+# 폴백 분류 키워드 (부분 문자열 일치, 긴 키워드를 먼저 시도하도록 정렬)
+_CARGO_TRACKING_KEYWORDS = (
+    "화물",
+    "통관조회",
+    "조회",
+    "추적",
+    "운송",
+    "배송",
+    "컨테이너",
+    "선적",
+    "화물번호",
+    "추적번호",
+    "운송장번호",
+    "선적번호",
+    "bl",
+    "awb",
+    "tracking",
+    "cargo",
+    "shipment",
+    "container",
+)
+_BASIC_TRADE_KEYWORDS = (
+    "무역",
+    "수출",
+    "수입",
+    "관세",
+    "통관",
+    "원산지",
+    "fta",
+    "trade",
+    "export",
+    "import",
+    "tariff",
+    "customs",
+)
+
+
+def _compile_keyword_re(keywords: tuple) -> re.Pattern:
+    """키워드 목록을 하나의 정규식 alternation으로 컴파일"""
+    return re.compile("|".join(map(re.escape, sorted(keywords, key=len, reverse=True))))
+
+
+_CARGO_TRACKING_KEYWORD_RE = _compile_keyword_re(_CARGO_TRACKING_KEYWORDS)
+_BASIC_TRADE_KEYWORD_RE = _compile_keyword_re(_BASIC_TRADE_KEYWORDS)
+
 
 class LLMMonitoringOutput(BaseModel):
     """LLM의 JSON 출력을 검증하기 위한 Pydantic 모델."""
@@ -202,8 +250,7 @@ class LLMService:
         question_lower = question.lower()
 
         # HSCode 패턴 확인
-        hscode_pattern = r"\b(\d{4}\.\d{2}|\d{6}|\d{10})\b"
-        if re.search(hscode_pattern, question):
+        if _HSCODE_PATTERN_RE.search(question):
             return QuestionClassification(
                 is_trade_related=True,
                 confidence=0.95,
@@ -212,60 +259,25 @@ class LLMService:
             )
 
         # 화물통관 조회 키워드 확인 (무역 키워드보다 먼저 체크)
-        cargo_tracking_keywords = [
-            "화물",
-            "통관조회",
-            "조회",
-            "추적",
-            "운송",
-            "배송",
-            "컨테이너",
-            "선적",
-            "화물번호",
-            "추적번호",
-            "운송장번호",
-            "선적번호",
-            "bl",
-            "awb",
-            "tracking",
-            "cargo",
-            "shipment",
-            "container",
-        ]
-
-        for keyword in cargo_tracking_keywords:
-            if keyword in question_lower:
-                return QuestionClassification(
-                    is_trade_related=True,
-                    confidence=0.8,
-                    category="cargo_tracking",
-                    reasoning=f"화물통관 조회 키워드 '{keyword}' 감지됨",
-                )
+        # 키워드마다 `in` 검사를 반복하지 않고 결합된 정규식으로 한 번만 스캔
+        cargo_match = _CARGO_TRACKING_KEYWORD_RE.search(question_lower)
+        if cargo_match:
+            return QuestionClassification(
+                is_trade_related=True,
+                confidence=0.8,
+                category="cargo_tracking",
+                reasoning=f"화물통관 조회 키워드 '{cargo_match.group(0)}' 감지됨",
+            )
 
         # 기본 무역 키워드 확인
-        basic_trade_keywords = [
-            "무역",
-            "수출",
-            "수입",
-            "관세",
-            "통관",
-            "원산지",
-            "fta",
-            "trade",
-            "export",
-            "import",
-            "tariff",
-            "customs",
-        ]
-
-        for keyword in basic_trade_keywords:
-            if keyword in question_lower:
-                return QuestionClassification(
-                    is_trade_related=True,
-                    confidence=0.7,
-                    category="trade_general",
-                    reasoning=f"무역 키워드 '{keyword}' 감지됨",
-                )
+        trade_match = _BASIC_TRADE_KEYWORD_RE.search(question_lower)
+        if trade_match:
+            return QuestionClassification(
+                is_trade_related=True,
+                confidence=0.7,
+                category="trade_general",
+                reasoning=f"무역 키워드 '{trade_match.group(0)}' 감지됨",
+            )
 
         return QuestionClassification(
             is_trade_related=False,
@@ -1,17 +1,20 @@
 import asyncio
 import logging
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Optional, Set
 from dataclasses import dataclass
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import BackgroundTasks
 
 from app.models.chat_models import ChatRequest
 from app.models.schemas import DetailPageInfo
-from app.services.detail_page_service import DetailPageService
+from app.services.detail_page_service import get_detail_page_service
 from app.services.sse_event_generator import SSEEventGenerator
 
 logger = logging.getLogger(__name__)
 
+# 스트림이 먼저 종료되어도 진행 중인 작업이 GC되지 않도록 참조를 보관
+_background_tasks: Set[asyncio.Task] = set()
+
 
 @dataclass
 class ParallelTaskResults:
@@ -26,7 +29,7 @@ class ParallelTaskManager:
     """3단계 병렬 처리 매니저"""
 
     def __init__(self):
-        self.detail_page_service = DetailPageService()
+        self.detail_page_service = get_detail_page_service()
         self.sse_generator = SSEEventGenerator()
 
     async def execute_parallel_tasks(
@@ -53,6 +56,9 @@ class ParallelTaskManager:
         chat_save_task = asyncio.create_task(
             self._execute_chat_saving(chat_request, db)
         )
+        for task in (detail_page_task, chat_save_task):
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
 
         # 상세페이지 작업 완료를 기다리며 이벤트 생성
         try:
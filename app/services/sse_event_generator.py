@@ -1,9 +1,10 @@
-import json
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, AsyncGenerator, Optional, List
 import uuid
 
+import orjson
+
 from app.models.schemas import DetailPageInfo, DetailButton
 
 
@@ -11,12 +12,13 @@ class SSEEventGenerator:
     """SSE 이벤트 생성기"""
 
     def _get_timestamp(self) -> str:
-        """ISO 8601 형식의 타임스탬프를 반환함"""
-        return datetime.utcnow().isoformat() + "Z"
+        """ISO 8601 형식의 UTC 타임스탬프를 반환함 (한 번의 포맷팅으로 생성)"""
+        return f"{datetime.now(timezone.utc):%Y-%m-%dT%H:%M:%S.%f}Z"
 
     def _format_event(self, event_name: str, data: Dict[str, Any]) -> str:
-        """SSE 이벤트 문자열을 포맷팅함"""
-        return f"event: {event_name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        """SSE 이벤트 문자열을 포맷팅함 (orjson 직렬화, 비ASCII 문자 그대로 유지)"""
+        payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+        return f"event: {event_name}\ndata: {payload}\n\n"
 
     def generate_hscode_classification_event(
         self,
@@ -27,6 +29,7 @@ class SSEEventGenerator:
         alternative_codes: Optional[List[str]] = None,
     ) -> str:
         """HSCode 분류 결과 이벤트 생성"""
+        timestamp = self._get_timestamp()
         data = {
             "type": "hscode_classification",
             "classification_result": {
@@ -35,13 +38,13 @@ class SSEEventGenerator:
                 "classification_reason": classification_reason,
                 "product_name": product_name,
                 "alternative_codes": alternative_codes or [],
-                "classified_at": self._get_timestamp(),
+                "classified_at": timestamp,
             },
             "metadata": {
                 "source": "hscode_classification_service",
                 "processing_completed": True,
             },
-            "timestamp": self._get_timestamp(),
+            "timestamp": timestamp,
         }
         return self._format_event("hscode_classification_result", data)
 
@@ -193,6 +196,48 @@ class SSEEventGenerator:
         }
         return self._format_event("detail_buttons_error", data)
 
+    def generate_detail_section_event(
+        self, hscode: str, section: str, result: Any
+    ) -> str:
+        """상세 정보 항목 생성 완료 이벤트 (실패한 항목은 빈 데이터와 오류 메시지)"""
+        failed = isinstance(result, Exception)
+        data = {
+            "type": "detail_section",
+            "hscode": hscode,
+            "section": section,
+            "data": {} if failed else result,
+            "error": str(result) if failed else None,
+            "timestamp": self._get_timestamp(),
+        }
+        return self._format_event("detail_section", data)
+
+    def generate_detail_sections_complete_event(
+        self, hscode: str, sections_generated: int, processing_time_ms: int
+    ) -> str:
+        """상세 정보 전체 항목 생성 완료 이벤트"""
+        data = {
+            "type": "complete",
+            "hscode": hscode,
+            "sectionsGenerated": sections_generated,
+            "totalProcessingTime": processing_time_ms,
+            "timestamp": self._get_timestamp(),
+        }
+        return self._format_event("detail_sections_complete", data)
+
+    def generate_detail_sections_error_event(
+        self, hscode: str, error_code: str, error_message: str
+    ) -> str:
+        """상세 정보 항목 스트리밍 에러 이벤트"""
+        data = {
+            "type": "error",
+            "hscode": hscode,
+            "errorCode": error_code,
+            "errorMessage": error_message,
+            "timestamp": self._get_timestamp(),
+            "retryInfo": {"retryable": True, "retryAfter": 30, "maxRetries": 3},
+        }
+        return self._format_event("detail_sections_error", data)
+
     def _get_button_description(self, button_type: str) -> str:
         """버튼 타입별 설명 반환"""
         descriptions = {
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+상세 정보 항목별 모델 요청 페이로드 테스트 스크립트
+(항목별 max_tokens/thinking 설정이 실제 API 요청에 반영되는지 확인)
+"""
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from app.services.enhanced_detail_generator import (
+    NO_THINKING_SECTIONS,
+    SECTION_MAX_TOKENS,
+    EnhancedDetailGenerator,
+)
+
+
+@pytest.fixture(scope="module")
+def section_payloads():
+    """항목별 모델의 Anthropic 요청 페이로드 (bind 인자 포함)"""
+    generator = EnhancedDetailGenerator()
+    payloads = {}
+    for section, llm in generator._section_llms.items():
+        model = getattr(llm, "bound", llm)
+        bound_kwargs = getattr(llm, "kwargs", {})
+        payloads[section] = model._get_request_payload(
+            [HumanMessage(content="test")], **bound_kwargs
+        )
+    return payloads
+
+
+@pytest.mark.parametrize("section", sorted(SECTION_MAX_TOKENS))
+def test_section_max_tokens_applied(section_payloads, section: str):
+    """항목별 max_tokens가 요청에 그대로 반영됨"""
+    assert section_payloads[section]["max_tokens"] == SECTION_MAX_TOKENS[section]
+
+
+@pytest.mark.parametrize("section", sorted(SECTION_MAX_TOKENS))
+def test_thinking_budget_below_max_tokens(section_payloads, section: str):
+    """thinking 예산은 항상 max_tokens보다 작아야 함 (같거나 크면 API가 400 반환)"""
+    payload = section_payloads[section]
+    thinking = payload.get("thinking") or {}
+    if thinking.get("type") == "enabled":
+        assert thinking["budget_tokens"] < payload["max_tokens"]
+
+
+@pytest.mark.parametrize("section", sorted(NO_THINKING_SECTIONS))
+def test_no_thinking_sections_omit_thinking(section_payloads, section: str):
+    """thinking을 끈 항목은 요청에 thinking 설정이 없어야 함"""
+    assert "thinking" not in section_payloads[section]
+
+
+def test_forced_tool_choice_without_thinking(section_payloads):
+    """도구 호출을 강제하는 항목은 thinking이 없어야 함 (함께 쓰면 API가 거부)"""
+    for section, payload in section_payloads.items():
+        if (payload.get("tool_choice") or {}).get("type") == "tool":
+            assert "thinking" not in payload, section
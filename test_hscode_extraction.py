@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+질문에 명시된 HSCode 추출 테스트 스크립트
+(HS 키워드 없는 숫자열은 HSCode로 보지 않아야 함)
+"""
+
+import pytest
+
+from app.services.hscode_service import _extract_explicit_hscode
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("HS코드 8517.12.00 관세율 알려줘", "85171200"),
+        ("HSCode: 8517120000 수입 규제", "8517120000"),
+        ("hs 851712 수입 요건", "851712"),
+        ("세번은 0201.10 인가요", "020110"),
+        ("품목번호 3304.99.10.00 통관 절차", "3304991000"),
+        ("스마트폰 HS코드 알려줘, 8517.12 맞나요?", "851712"),
+    ],
+)
+def test_explicit_hscode_detected(query: str, expected: str):
+    """HS 키워드와 함께 쓰인 점 표기/라벨 코드는 추출"""
+    assert _extract_explicit_hscode(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        # 가격
+        "가격 100000원짜리 제품 수출하려고요",
+        "HS코드 알려줘, 단가는 100000원",
+        # 날짜
+        "2024.01 기준 HS코드 알려줘",
+        "HS코드 2024.01.15 기준으로 바뀌었나요",
+        # 전화번호
+        "연락처 12345678 HS 문의",
+        "연락처 01012345678 로 HS코드 회신 부탁",
+        # HS 키워드 없는 코드
+        "8517.12.00 관세율",
+    ],
+)
+def test_non_hscode_numbers_ignored(query: str):
+    """가격, 날짜, 전화번호 등 구분자 없는 숫자열은 HSCode로 보지 않음"""
+    assert _extract_explicit_hscode(query) is None
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+의도 분류 정규식 사전 필터 테스트 스크립트
+(전화번호 등 숫자만 있는 질의는 화물 추적으로 판별하지 않아야 함)
+"""
+
+import pytest
+
+from app.services.intent_classification_service import (
+    IntentClassificationService,
+    IntentType,
+)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "MSCU1234567 컨테이너 위치 알려줘",
+        "화물 12345678901 조회해줘",
+        "운송장 번호 1234567890123 배송 상태",
+        "B/L 123456789012 tracking",
+    ],
+)
+def test_cargo_numbers_detected(message: str):
+    """컨테이너 번호 또는 화물 키워드와 함께 쓰인 번호는 화물 추적으로 판별"""
+    result = IntentClassificationService._prefilter_intent(message)
+    assert result is not None
+    assert result.intent_type == IntentType.CARGO_TRACKING
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "연락처 01012345678",
+        "제 번호는 01012345678 입니다. 수출 절차 알려주세요",
+        "사업자 번호 1234567890123 로 등록했어요",
+    ],
+)
+def test_phone_numbers_not_cargo(message: str):
+    """화물 키워드 없이 숫자만 있는 질의는 화물 추적으로 판별하지 않음"""
+    result = IntentClassificationService._prefilter_intent(message)
+    assert result is None or result.intent_type != IntentType.CARGO_TRACKING